@@ -0,0 +1,191 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+#
+# Offline benchmark, runs HamsterKombatAccount.Start() for N simulated accounts
+# against the local mock server and reports requests/sec, round wall-time and
+# p50/p99 latency per endpoint.
+#
+# Usage: python benchmark/bench.py --accounts 20 --rounds 2 --latency 50 --sleep-scale 0
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_server import MockHamsterServer
+
+
+def BenchmarkConfig(args):
+    config = {
+        "ConfigFileVersion": 1,
+        "AccountsRecheckTime": 0,
+        "MaxRandomDelay": 0,
+        "HeadlessMode": True,
+        "MaxConcurrentAccounts": args.concurrency,
+        "PromoKeyWorkers": 0,
+        "telegramBotLogging": {"is_active": False, "bot_token": "", "messages": {}},
+    }
+    config["AccountList"] = [
+        {
+            "account_name": f"Bench {i + 1}",
+            "Authorization": f"Bearer bench-{i + 1}",
+            "UserAgent": "Mozilla/5.0 (Linux; Android 14) AppleWebKit/537.36 Chrome/125.0 Mobile Safari/537.36",
+            "Proxy": {},
+            "config": {
+                "auto_tap": True,
+                "auto_free_tap_boost": True,
+                "auto_get_daily_cipher": True,
+                "auto_get_daily_task": True,
+                "auto_get_task": True,
+                "auto_finish_mini_game": False,
+                "auto_daily_combo_enable": False,
+                "auto_playground_games": args.playground,
+                "auto_upgrade": True,
+                "auto_upgrade_start": 2_000_000,
+                "auto_upgrade_min": 100_000,
+                "wait_for_best_card": True,
+                "enable_parallel_upgrades": True,
+                "parallel_upgrades_max_price_per_hour": 6000,
+                "show_num_buy_options": 0,
+                "max_promo_games_per_round": 1,
+            },
+            "telegram_chat_id": "",
+        }
+        for i in range(args.accounts)
+    ]
+    return config
+
+
+class LatencyStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+
+    # requests response hook
+    def RecordResponse(self, response, *args, **kwargs):
+        key = (response.request.method, urlparse(response.request.url).path)
+        with self.lock:
+            self.samples.setdefault(key, []).append(response.elapsed.total_seconds())
+            if response.status_code >= 400:
+                self.errors[key] = self.errors.get(key, 0) + 1
+        return response
+
+    def Total(self):
+        with self.lock:
+            return sum(len(samples) for samples in self.samples.values())
+
+    def Report(self):
+        lines = [
+            f"{'Method':<8} {'Endpoint':<36} {'Count':>7} {'Errors':>7} {'p50 ms':>9} {'p99 ms':>9}"
+        ]
+        with self.lock:
+            for key in sorted(self.samples, key=lambda item: item[1]):
+                samples = sorted(self.samples[key])
+                path = key[1]
+                if path.startswith("/clicker/config/"):
+                    path = "/clicker/config/{version}"
+                lines.append(
+                    f"{key[0]:<8} {path:<36} {len(samples):>7} {self.errors.get(key, 0):>7} "
+                    f"{Percentile(samples, 50) * 1000:>9.1f} {Percentile(samples, 99) * 1000:>9.1f}"
+                )
+        return "\n".join(lines)
+
+
+def Percentile(samples, percent):
+    if not samples:
+        return 0
+    index = min(int(round(percent / 100 * (len(samples) - 1))), len(samples) - 1)
+    return samples[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline bot benchmark")
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=20, help="Latency in ms")
+    parser.add_argument("--jitter", type=float, default=10, help="Random extra ms")
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--cooldown", type=int, default=0, help="Card cooldown")
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument(
+        "--sleep-scale",
+        type=float,
+        default=0,
+        help="Multiplier of the bot sleeps, 0 removes them, 1 keeps them",
+    )
+    parser.add_argument("--playground", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    configFile = tempfile.NamedTemporaryFile(
+        "w", suffix=".json", delete=False, encoding="utf-8"
+    )
+    json.dump(BenchmarkConfig(args), configFile)
+    configFile.close()
+    os.environ["HAMSTER_CONFIG"] = configFile.name
+    sleep = time.sleep
+    time.sleep = lambda seconds: sleep(max(seconds, 0) * args.sleep_scale)
+
+    import main as bot
+    from sessions import AccountSession
+
+    if not args.verbose:
+        bot.log.setLevel(logging.WARNING)
+
+    stats = LatencyStats()
+    createSession = AccountSession._CreateSession
+
+    def CreateTimedSession(self):
+        session = createSession(self)
+        session.hooks["response"].append(stats.RecordResponse)
+        return session
+
+    AccountSession._CreateSession = CreateTimedSession
+
+    server = MockHamsterServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        cooldown=args.cooldown,
+        cards=args.cards,
+    ).Start()
+    bot.HamsterApiUrl = server.url
+    bot.GamePromoApiUrl = server.url
+
+    accounts = [bot.HamsterKombatAccount(account) for account in bot.AccountList]
+    totalStart = time.perf_counter()
+    for round in range(args.rounds):
+        requestsBefore = stats.Total()
+        roundStart = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(args.concurrency, 1)) as executor:
+            list(executor.map(bot.RunAccountRound, accounts))
+        roundTime = time.perf_counter() - roundStart
+        roundRequests = stats.Total() - requestsBefore
+        print(
+            f"Round {round + 1}: {roundTime:.2f} s wall-time, {roundRequests} requests, "
+            f"{roundRequests / roundTime:.1f} requests/sec"
+        )
+
+    totalTime = time.perf_counter() - totalStart
+    print(
+        f"Total: {args.accounts} accounts, {args.rounds} rounds, {totalTime:.2f} s, "
+        f"{stats.Total() / totalTime:.1f} requests/sec"
+    )
+    print(stats.Report())
+    server.Stop()
+    os.remove(configFile.name)
+
+
+if __name__ == "__main__":
+    main()
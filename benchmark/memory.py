@@ -0,0 +1,86 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+#
+# Memory benchmark, reports the memory kept per account after the accounts are
+# created and after one round against the local mock server.
+#
+# Usage: python benchmark/memory.py --accounts 200
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench import BenchmarkConfig
+from mock_server import MockHamsterServer
+
+
+# Memory allocated by the bot, the mock server runs in the same process and is excluded
+def TracedBytes():
+    gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, "*mock_server.py")]
+    )
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-account memory benchmark")
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--playground", action="store_true")
+    args = parser.parse_args()
+
+    configFile = tempfile.NamedTemporaryFile(
+        "w", suffix=".json", delete=False, encoding="utf-8"
+    )
+    json.dump(BenchmarkConfig(args), configFile)
+    configFile.close()
+    os.environ["HAMSTER_CONFIG"] = configFile.name
+
+    sleep = time.sleep
+    time.sleep = lambda seconds: sleep(0)
+
+    import main as bot
+
+    bot.log.setLevel(logging.WARNING)
+
+    server = MockHamsterServer(latency=0, jitter=0, cards=args.cards).Start()
+    bot.HamsterApiUrl = server.url
+    bot.GamePromoApiUrl = server.url
+
+    tracemalloc.start()
+    start = TracedBytes()
+    accounts = [bot.HamsterKombatAccount(account) for account in bot.AccountList]
+    created = TracedBytes()
+
+    with ThreadPoolExecutor(max_workers=max(args.concurrency, 1)) as executor:
+        list(executor.map(bot.RunAccountRound, accounts))
+    for account in accounts:
+        account.httpSession.Close()
+    afterRound = TracedBytes()
+    tracemalloc.stop()
+
+    print(f"Accounts: {len(accounts)}")
+    print(f"Created: {(created - start) / len(accounts):,.0f} bytes per account")
+    print(
+        f"After one round: {(afterRound - start) / len(accounts):,.0f} bytes per account "
+        f"(shared game config and metrics included)"
+    )
+
+    server.Stop()
+    os.remove(configFile.name)
+
+
+if __name__ == "__main__":
+    main()
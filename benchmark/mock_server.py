@@ -0,0 +1,492 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+#
+# Local stand-in for api.hamsterkombatgame.io and api.gamepromo.io.
+# It implements the endpoints the bot uses with fake data, so the bot can be
+# benchmarked without touching the real servers.
+#
+# Usage: python benchmark/mock_server.py --port 8080 --latency 50 --error-rate 0.01
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+ConfigVersion = "mock-config-1"
+
+PromoGameIds = [
+    "b4170868-cef0-424f-8eb9-be0622e8e8e3",
+    "c4480ac7-e178-4973-8061-9ed5b2e17954",
+]
+
+
+def EncodeCipher(text):
+    encoded = base64.b64encode(text.encode("ascii")).decode("ascii")
+    return encoded[:3] + "x" + encoded[3:]
+
+
+class MockAccount:
+    def __init__(self, token, cards):
+        self.token = token
+        self.id = str(abs(hash(token)) % 10**9)
+        self.balanceCoins = 50_000_000
+        self.maxTaps = 5000
+        self.availableTaps = self.maxTaps
+        self.tapsRecoverPerSec = 5
+        self.lastTapsUpdate = time.time()
+        self.earnPassivePerHour = 100_000
+        self.balanceKeys = 0
+        self.totalKeys = 0
+        self.cipherClaimed = False
+        self.completedTasks = set()
+        self.receivedKeys = {}
+        self.upgrades = {}
+        for card in cards:
+            self.upgrades[card["id"]] = dict(card)
+        self.lock = threading.Lock()
+
+    def UpdateTaps(self):
+        now = time.time()
+        self.availableTaps = min(
+            self.maxTaps,
+            self.availableTaps + (now - self.lastTapsUpdate) * self.tapsRecoverPerSec,
+        )
+        self.lastTapsUpdate = now
+
+    def ClickerUser(self):
+        self.UpdateTaps()
+        return {
+            "id": self.id,
+            "balanceCoins": self.balanceCoins,
+            "availableTaps": int(self.availableTaps),
+            "maxTaps": self.maxTaps,
+            "tapsRecoverPerSec": self.tapsRecoverPerSec,
+            "earnPassivePerHour": self.earnPassivePerHour,
+            "balanceKeys": self.balanceKeys,
+            "totalKeys": self.totalKeys,
+        }
+
+    def UpgradesForBuy(self):
+        now = time.time()
+        upgrades = []
+        for card in self.upgrades.values():
+            item = dict(card)
+            item["cooldownSeconds"] = max(int(card["cooldownUntil"] - now), 0)
+            del item["cooldownUntil"]
+            upgrades.append(item)
+        return upgrades
+
+
+class MockState:
+    def __init__(self, cards=100, cooldown=0, register_events=2, seed=1):
+        self.cooldown = cooldown
+        self.register_events = register_events
+        self.accounts = {}
+        self.clients = {}
+        self.codes = {}
+        self.lock = threading.Lock()
+        self.cards = []
+        generator = random.Random(seed)
+        for i in range(cards):
+            price = generator.randint(1_000, 5_000_000)
+            card = {
+                "id": f"card_{i}",
+                "name": f"Card {i}",
+                "price": price,
+                "profitPerHourDelta": max(price // generator.randint(500, 5000), 1),
+                "level": generator.randint(1, 10),
+                "isAvailable": True,
+                "isExpired": False,
+                "cooldownUntil": 0,
+            }
+            if i % 10 == 9:
+                card["isAvailable"] = False
+                card["condition"] = {
+                    "_type": "ByUpgrade",
+                    "upgradeId": f"card_{i - 1}",
+                    "level": card["level"] + 2,
+                }
+            self.cards.append(card)
+
+    def Account(self, headers):
+        token = headers.get("Authorization", "")
+        with self.lock:
+            if token not in self.accounts:
+                self.accounts[token] = MockAccount(token, self.cards)
+            return self.accounts[token]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockHamster/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _Payload(self):
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        if length == 0:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _Send(self, status, data=None, headers=None):
+        body = b"" if data is None else json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if data is not None:
+            self.send_header("Content-Type", "application/json")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _Delay(self):
+        server = self.server
+        latency = server.latency
+        if server.jitter > 0:
+            latency += random.uniform(0, server.jitter)
+        if latency > 0:
+            # Event.wait keeps working when the benchmark scales time.sleep
+            threading.Event().wait(latency / 1000)
+
+    def do_OPTIONS(self):
+        self._Delay()
+        path = urlparse(self.path).path
+        self._Send(200 if path == "/ip" else 204)
+
+    def do_GET(self):
+        self._Handle("GET")
+
+    def do_POST(self):
+        self._Handle("POST")
+
+    def _Handle(self, method):
+        self._Delay()
+        path = urlparse(self.path).path
+        payload = self._Payload() if method == "POST" else {}
+        if random.random() < self.server.error_rate:
+            self._Send(500, {"error_code": "MOCK_ERROR"})
+            return
+
+        handler = Routes.get((method, path))
+        if handler is None and path.startswith("/clicker/config/"):
+            handler = ConfigVersionRoute
+        if handler is None and path.startswith("/promo/1/"):
+            handler = Routes.get((method, path.replace("/promo/1/", "/promo/")))
+
+        if handler is None:
+            self._Send(404, {"error_code": "NOT_FOUND"})
+            return
+
+        status, data = handler(self.server.state, self.headers, payload)
+        self._Send(status, data, {"config-version": ConfigVersion})
+
+
+def IPRoute(state, headers, payload):
+    return 200, {"ip": "127.0.0.1", "asn_org": "Mock", "country_code": "XX"}
+
+
+def AccountInfoRoute(state, headers, payload):
+    account = state.Account(headers)
+    return 200, {"accountInfo": {"id": account.id, "name": f"mock-{account.id}"}}
+
+
+def SyncRoute(state, headers, payload):
+    account = state.Account(headers)
+    with account.lock:
+        return 200, {"clickerUser": account.ClickerUser()}
+
+
+def ConfigRoute(state, headers, payload):
+    account = state.Account(headers)
+    return 200, {
+        "dailyCipher": {
+            "cipher": EncodeCipher("MOCK"),
+            "isClaimed": account.cipherClaimed,
+        },
+        "dailyKeysMiniGames": {},
+    }
+
+
+def ConfigVersionRoute(state, headers, payload):
+    return 200, {
+        "config": {
+            "tasks": [
+                {
+                    "id": "streak_days_special",
+                    "rewardsByWeeksAndDays": [
+                        {"week": 1, "days": [{"day": 1, "coins": 500}]}
+                    ],
+                },
+                {"id": "mock_youtube", "rewardCoins": 100_000},
+            ],
+            "skins": [],
+        }
+    }
+
+
+def UpgradesForBuyRoute(state, headers, payload):
+    account = state.Account(headers)
+    with account.lock:
+        return 200, {
+            "upgradesForBuy": account.UpgradesForBuy(),
+            "dailyCombo": {"upgradeIds": [], "isClaimed": False},
+        }
+
+
+def BuyUpgradeRoute(state, headers, payload):
+    account = state.Account(headers)
+    with account.lock:
+        card = account.upgrades.get(payload.get("upgradeId"))
+        if card is None or not card["isAvailable"]:
+            return 400, {"error_code": "UPGRADE_NOT_AVAILABLE"}
+        if card["cooldownUntil"] > time.time():
+            return 400, {"error_code": "UPGRADE_COOLDOWN"}
+        if card["price"] > account.balanceCoins:
+            return 400, {"error_code": "INSUFFICIENT_FUNDS"}
+
+        account.balanceCoins -= card["price"]
+        account.earnPassivePerHour += card["profitPerHourDelta"]
+        card["level"] += 1
+        card["price"] = int(card["price"] * 1.1)
+        card["profitPerHourDelta"] = int(card["profitPerHourDelta"] * 1.05) + 1
+        card["cooldownUntil"] = time.time() + state.cooldown
+
+        for other in account.upgrades.values():
+            condition = other.get("condition") or {}
+            if condition.get("upgradeId") == card["id"] and card[
+                "level"
+            ] > condition.get("level", 0):
+                other["isAvailable"] = True
+
+        return 200, {
+            "clickerUser": account.ClickerUser(),
+            "upgradesForBuy": account.UpgradesForBuy(),
+        }
+
+
+def TapRoute(state, headers, payload):
+    account = state.Account(headers)
+    with account.lock:
+        account.UpdateTaps()
+        count = min(int(payload.get("count", 0)), int(account.availableTaps))
+        account.availableTaps -= count
+        account.balanceCoins += count
+        return 200, {"clickerUser": account.ClickerUser()}
+
+
+def BoostsForBuyRoute(state, headers, payload):
+    return 200, {
+        "boostsForBuy": [
+            {"id": "BoostFullAvailableTaps", "price": 0, "cooldownSeconds": 3600}
+        ]
+    }
+
+
+def BuyBoostRoute(state, headers, payload):
+    account = state.Account(headers)
+    with account.lock:
+        return 200, {"clickerUser": account.ClickerUser()}
+
+
+def ListTasksRoute(state, headers, payload):
+    account = state.Account(headers)
+    with account.lock:
+        return 200, {
+            "tasks": [
+                {
+                    "id": "streak_days_special",
+                    "isCompleted": "streak_days_special" in account.completedTasks,
+                    "days": 1,
+                    "weeks": 1,
+                },
+                {
+                    "id": "mock_youtube",
+                    "isCompleted": "mock_youtube" in account.completedTasks,
+                },
+            ]
+        }
+
+
+def ListAirdropTasksRoute(state, headers, payload):
+    return 200, {"airdropTasks": []}
+
+
+def CheckTaskRoute(state, headers, payload):
+    account = state.Account(headers)
+    with account.lock:
+        account.completedTasks.add(payload.get("taskId"))
+        return 200, {"task": {"id": payload.get("taskId"), "isCompleted": True}}
+
+
+def GetSkinRoute(state, headers, payload):
+    return 200, {"skins": []}
+
+
+def ClaimDailyCipherRoute(state, headers, payload):
+    account = state.Account(headers)
+    with account.lock:
+        account.cipherClaimed = True
+        return 200, {"clickerUser": account.ClickerUser()}
+
+
+def GetPromosRoute(state, headers, payload):
+    account = state.Account(headers)
+    with account.lock:
+        return 200, {
+            "promos": [
+                {"promoId": promoId, "title": {"en": promoId}, "keysPerDay": 4}
+                for promoId in PromoGameIds
+            ],
+            "states": [
+                {"promoId": promoId, "receiveKeysToday": received}
+                for promoId, received in account.receivedKeys.items()
+            ],
+        }
+
+
+def ApplyPromoRoute(state, headers, payload):
+    account = state.Account(headers)
+    promoCode = payload.get("promoCode", "")
+    with state.lock:
+        promoId = state.codes.pop(promoCode, None)
+    if promoId is None:
+        return 400, {"error_code": "PROMO_CODE_INVALID"}
+
+    with account.lock:
+        account.receivedKeys[promoId] = account.receivedKeys.get(promoId, 0) + 1
+        account.balanceKeys += 1
+        account.totalKeys += 1
+        return 200, {"reward": {"type": "keys", "amount": 1}}
+
+
+def LoginClientRoute(state, headers, payload):
+    clientToken = str(uuid.uuid4())
+    with state.lock:
+        state.clients[clientToken] = 0
+    return 200, {"clientToken": clientToken}
+
+
+def GetClientRoute(state, headers, payload):
+    return 200, {}
+
+
+def RegisterEventRoute(state, headers, payload):
+    clientToken = headers.get("Authorization", "").replace("Bearer ", "")
+    with state.lock:
+        if clientToken not in state.clients:
+            return 401, {"error_code": "UNAUTHORIZED"}
+        state.clients[clientToken] += 1
+        return 200, {"hasCode": state.clients[clientToken] >= state.register_events}
+
+
+def CreateCodeRoute(state, headers, payload):
+    clientToken = headers.get("Authorization", "").replace("Bearer ", "")
+    with state.lock:
+        if state.clients.get(clientToken, 0) < state.register_events:
+            return 400, {"error_code": "NOT_READY"}
+        promoCode = f"MOCK-{uuid.uuid4().hex[:12].upper()}"
+        state.codes[promoCode] = payload.get("promoId")
+        return 200, {"promoCode": promoCode}
+
+
+Routes = {
+    ("GET", "/ip"): IPRoute,
+    ("POST", "/auth/account-info"): AccountInfoRoute,
+    ("POST", "/clicker/sync"): SyncRoute,
+    ("POST", "/clicker/config"): ConfigRoute,
+    ("POST", "/clicker/upgrades-for-buy"): UpgradesForBuyRoute,
+    ("POST", "/clicker/buy-upgrade"): BuyUpgradeRoute,
+    ("POST", "/clicker/tap"): TapRoute,
+    ("POST", "/clicker/boosts-for-buy"): BoostsForBuyRoute,
+    ("POST", "/clicker/buy-boost"): BuyBoostRoute,
+    ("POST", "/clicker/list-tasks"): ListTasksRoute,
+    ("POST", "/clicker/list-airdrop-tasks"): ListAirdropTasksRoute,
+    ("POST", "/clicker/check-task"): CheckTaskRoute,
+    ("POST", "/clicker/get-skin"): GetSkinRoute,
+    ("POST", "/clicker/claim-daily-cipher"): ClaimDailyCipherRoute,
+    ("POST", "/clicker/get-promos"): GetPromosRoute,
+    ("POST", "/clicker/apply-promo"): ApplyPromoRoute,
+    ("POST", "/promo/login-client"): LoginClientRoute,
+    ("POST", "/promo/get-client"): GetClientRoute,
+    ("POST", "/promo/register-event"): RegisterEventRoute,
+    ("POST", "/promo/create-code"): CreateCodeRoute,
+}
+
+
+class MockHamsterServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0,
+        jitter=0,
+        error_rate=0,
+        cooldown=0,
+        cards=100,
+        register_events=2,
+    ):
+        super().__init__((host, port), MockHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.state = MockState(cards, cooldown, register_events)
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def Start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def Stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Hamster Kombat API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0, help="Latency in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Random extra ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="0.0 - 1.0")
+    parser.add_argument("--cooldown", type=int, default=0, help="Card cooldown")
+    parser.add_argument("--cards", type=int, default=100)
+    parser.add_argument("--register-events", type=int, default=2)
+    args = parser.parse_args()
+
+    server = MockHamsterServer(
+        args.host,
+        args.port,
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.cooldown,
+        args.cards,
+        args.register_events,
+    )
+    print(f"Mock Hamster Kombat API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import datetime
+import math
+import time
+from array import array
+
+from planner import LevelsToUnlock
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _ExpiresIn(card, now):
+    expiresAt = card.get("expiresAt")
+    if not expiresAt:
+        return math.inf
+    try:
+        expiresAt = datetime.datetime.fromisoformat(expiresAt.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return math.inf
+    return expiresAt.timestamp() - now
+
+
+# Profit of the locked cards a card unlocks ("ByUpgrade" condition).
+# The further the required level is, the less likely it is reached, so the profit
+# of each unlocked card is divided by the number of levels still needed.
+def _UnlockProfits(cards, upgrades):
+    cardsById = {card["id"]: card for card in cards}
+    unlockProfits = {}
+    for locked in upgrades:
+        if locked.get("isAvailable", True) or locked.get("isExpired", False):
+            continue
+        condition = locked.get("condition") or {}
+        if condition.get("_type") != "ByUpgrade":
+            continue
+        upgradeId = condition.get("upgradeId")
+        if upgradeId not in cardsById:
+            continue
+        neededLevels = max(LevelsToUnlock(condition, cardsById[upgradeId]), 1)
+        unlockProfits[upgradeId] = (
+            unlockProfits.get(upgradeId, 0)
+            + max(locked.get("profitPerHourDelta", 0), 0) / neededLevels
+        )
+    return [unlockProfits.get(card["id"], 0) for card in cards]
+
+
+# Cost models get the columns of the table (price, profit, cooldown, wait, expiresIn and
+# unlockProfit) and return the scores. With NumPy the model runs once on the whole columns,
+# without NumPy the columns are arrays of floats and the model runs once per card.
+# Models with higher_is_better are ranked descending.
+CostModels = {}
+
+
+def RegisterCostModel(name, function, higher_is_better=False):
+    CostModels[name] = (function, higher_is_better)
+
+
+# Hours until the price is paid back by the profit
+RegisterCostModel("payback", lambda c: c["price"] / c["profit"])
+
+# Payback hours including the wait for the cooldown or the balance
+RegisterCostModel("payback_wait", lambda c: c["wait"] / 3600 + c["price"] / c["profit"])
+
+# Payback hours with the profit of the locked cards the card helps to unlock
+RegisterCostModel(
+    "payback_unlock",
+    lambda c: c["price"] / (c["profit"] + c["unlockProfit"]),
+)
+
+# Share of the price earned back per second of wall time (1/s) until the card paid back,
+# the wait for the cooldown or the balance included. Without a wait it is 1 / payback seconds.
+RegisterCostModel(
+    "roi",
+    lambda c: 1 / (c["wait"] + 3600 * c["price"] / c["profit"]),
+    higher_is_better=True,
+)
+
+
+# Cards of upgradesForBuy loaded into columns, every score is computed for all cards at once.
+# Only cards with a price and profit are kept; balance and income (coins per hour) are used
+# to compute how long to wait until a card can be bought. all_upgrades is the full
+# upgradesForBuy list when upgrades is already filtered, its locked cards are used for unlockProfit.
+class CardTable:
+    def __init__(self, upgrades, balance=None, income=0, now=None, all_upgrades=None):
+        if now is None:
+            now = time.time()
+
+        self.cards = [
+            card
+            for card in upgrades
+            if not card.get("isExpired", False)
+            and card.get("price", 0) > 0
+            and card.get("profitPerHourDelta", 0) > 0
+        ]
+
+        price = [float(card["price"]) for card in self.cards]
+        cooldown = [float(card.get("cooldownSeconds", 0) or 0) for card in self.cards]
+        if balance is None:
+            balanceWait = [0.0] * len(self.cards)
+        elif income > 0:
+            balanceWait = [max(value - balance, 0) / (income / 3600) for value in price]
+        else:
+            balanceWait = [0.0 if value <= balance else math.inf for value in price]
+
+        columns = {
+            "price": price,
+            "profit": [float(card["profitPerHourDelta"]) for card in self.cards],
+            "cooldown": cooldown,
+            "wait": [max(a, b) for a, b in zip(cooldown, balanceWait)],
+            "expiresIn": [_ExpiresIn(card, now) for card in self.cards],
+            "unlockProfit": [
+                float(value)
+                for value in _UnlockProfits(
+                    self.cards, upgrades if all_upgrades is None else all_upgrades
+                )
+            ],
+        }
+
+        if np is not None:
+            self.columns = {
+                name: np.array(values, dtype=float) for name, values in columns.items()
+            }
+        else:
+            self.columns = {
+                name: array("d", values) for name, values in columns.items()
+            }
+        self.scores = {}
+
+    def __len__(self):
+        return len(self.cards)
+
+    def Score(self, model):
+        if model not in CostModels:
+            raise ValueError(
+                f"Unknown card score model {model}, available: {', '.join(CostModels)}"
+            )
+
+        if model not in self.scores:
+            function = CostModels[model][0]
+            if np is not None:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    scores = function(self.columns).tolist()
+            else:
+                scores = [
+                    function({name: values[i] for name, values in self.columns.items()})
+                    for i in range(len(self.cards))
+                ]
+            self.scores[model] = scores
+        return self.scores[model]
+
+    # Cards ordered from the best to the worst as (card, score) pairs.
+    # Cards above max_price and cards that expire before they can be bought are left out.
+    def Rank(self, model="payback", max_price=None):
+        scores = self.Score(model)
+        higherIsBetter = CostModels[model][1]
+        expiresIn = self.columns["expiresIn"]
+        wait = self.columns["wait"]
+        ranked = [
+            (card, scores[i])
+            for i, card in enumerate(self.cards)
+            if (max_price is None or card["price"] <= max_price)
+            # Cards without expiresAt never expire, even when they can not be paid (wait is inf)
+            and (math.isinf(expiresIn[i]) or wait[i] < expiresIn[i])
+        ]
+        # sort is stable, cards with the same score keep the order of the server
+        ranked.sort(key=lambda item: -item[1] if higherIsBetter else item[1])
+        return ranked
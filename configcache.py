@@ -0,0 +1,118 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from indexes import ConfigIndex
+
+
+# Shared cache of the versioned game config (/clicker/config/{configVersion}).
+# The config is the same for every account with the same version, so it is downloaded
+# once by the first account that sees a new version and kept in memory for the others.
+# If a directory is set the config is also stored on disk to survive restarts.
+class ConfigVersionCache:
+    def __init__(self, directory="", max_versions=3):
+        self.directory = directory
+        self.max_versions = max(int(max_versions), 1)
+        self.lock = threading.Lock()
+        self.versions = OrderedDict()
+        self.fetchLocks = {}
+        self.indexes = {}
+        if self.directory != "":
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _FilePath(self, version):
+        name = version
+        if not re.fullmatch(r"[A-Za-z0-9_.-]{1,64}", version):
+            name = hashlib.sha256(version.encode()).hexdigest()
+        return os.path.join(self.directory, f"config_{name}.json")
+
+    def _Remember(self, version, data):
+        with self.lock:
+            self.versions[version] = data
+            self.versions.move_to_end(version)
+            while len(self.versions) > self.max_versions:
+                oldVersion, _ = self.versions.popitem(last=False)
+                self.fetchLocks.pop(oldVersion, None)
+                self.indexes.pop(oldVersion, None)
+
+    def _Lookup(self, version):
+        with self.lock:
+            if version in self.versions:
+                self.versions.move_to_end(version)
+                return self.versions[version]
+        return None
+
+    def _Load(self, version):
+        if self.directory == "":
+            return None
+        try:
+            with open(self._FilePath(version), "r") as file:
+                return json.load(file)
+        except Exception:
+            return None
+
+    def _Save(self, version, data):
+        if self.directory == "":
+            return
+        path = self._FilePath(version)
+        tempPath = f"{path}.tmp"
+        with open(tempPath, "w") as file:
+            json.dump(data, file)
+        os.replace(tempPath, path)
+
+        # Only keep the newest versions on disk
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.startswith("config_") and name.endswith(".json")
+        ]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for oldFile in files[self.max_versions :]:
+            try:
+                os.remove(oldFile)
+            except OSError:
+                pass
+
+    # Lookup tables of the config, shared by all accounts with the same version
+    def GetIndex(self, version, configData):
+        with self.lock:
+            index = self.indexes.get(version)
+            if index is None or index[0] is not configData:
+                index = (configData, ConfigIndex(configData))
+                if version in self.versions:
+                    self.indexes[version] = index
+            return index[1]
+
+    # Returns the config of the version, fetch() is only called if no one has it yet
+    def Get(self, version, fetch):
+        data = self._Lookup(version)
+        if data is not None:
+            return data
+
+        with self.lock:
+            fetchLock = self.fetchLocks.setdefault(version, threading.Lock())
+
+        # Other accounts wait for the first download of the same version
+        with fetchLock:
+            data = self._Lookup(version)
+            if data is not None:
+                return data
+
+            data = self._Load(version)
+            if data is None:
+                data = fetch()
+                if data is None:
+                    return None
+                try:
+                    self._Save(version, data)
+                except Exception:
+                    pass
+
+            self._Remember(version, data)
+            return data
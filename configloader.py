@@ -0,0 +1,386 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import json
+import os
+import runpy
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Config files searched next to main.py when HAMSTER_CONFIG is not set
+ConfigFileNames = [
+    "config.py",
+    "config.yaml",
+    "config.yml",
+    "config.toml",
+    "config.json",
+]
+
+SupportedConfigVersion = 1
+
+# Global settings and their defaults
+GlobalDefaults = {
+    "AccountsRecheckTime": 300,
+    "MaxRandomDelay": 120,
+    "HeadlessMode": False,
+    "HeadlessActionDelay": [0.3, 1.5],
+    "MaxConcurrentAccounts": 5,
+    "BootstrapWorkers": 16,
+    "SchedulerMinDelay": 30,
+    "PromoKeyWorkers": 0,
+    "PromoCodeStoreFile": "",
+    "PromoCodeStock": 0,
+    "ConfigCacheDir": "",
+    "tapEngine": {"min_fill": 0.9, "wake_margin": 60},
+    "knownStateCache": {"enabled": True, "daily_reset_hour": 12, "max_age": 21600},
+    "stateJournal": {
+        "file": "",
+        "promo_session_max_age": 3600,
+        "task_recheck_time": 3600,
+    },
+    "telegramBotLogging": {
+        "is_active": False,
+        "bot_token": "",
+        "messages": {},
+    },
+    "metricsExport": {"server_enabled": False, "json_file": ""},
+    "rateLimits": {"proxy_rate": 0, "proxy_burst": 10, "proxy_connections": 0},
+    "AccountRoundDeadline": 0,
+    "requestTimeouts": {
+        "connect": 5,
+        "read_min": 3,
+        "read_max": 30,
+        "p99_multiplier": 3,
+    },
+    "httpRetry": {
+        "max_attempts": 3,
+        "base_delay": 1,
+        "max_delay": 30,
+        "breaker_failures": 5,
+        "breaker_open_seconds": 60,
+    },
+}
+
+# Global settings that are only read at startup
+RestartRequiredSettings = [
+    "MaxConcurrentAccounts",
+    "BootstrapWorkers",
+    "PromoKeyWorkers",
+    "PromoCodeStoreFile",
+    "ConfigCacheDir",
+    "stateJournal",
+    "tapEngine",
+    "telegramBotLogging",
+    "metricsExport",
+    "rateLimits",
+    "httpRetry",
+    "requestTimeouts",
+]
+
+# Account "config" options and their defaults
+AccountOptionDefaults = {
+    "auto_tap": True,
+    "auto_free_tap_boost": True,
+    "auto_get_daily_cipher": True,
+    "auto_get_daily_task": True,
+    "auto_get_task": True,
+    "auto_finish_mini_game": False,
+    "auto_claim_daily_combo": True,
+    "auto_daily_combo_enable": False,
+    "auto_daily_combo_max_price": 5_000_000,
+    "auto_playground_games": True,
+    "auto_upgrade": True,
+    "auto_upgrade_start": 2_000_000,
+    "auto_upgrade_min": 100_000,
+    "wait_for_best_card": True,
+    "enable_parallel_upgrades": True,
+    "parallel_upgrades_max_price_per_hour": 6000,
+    "show_num_buy_options": 0,
+    "card_score_model": "payback",
+    "upgrade_planner": False,
+    "upgrade_planner_horizon": 24,
+    "upgrade_planner_lookahead": 5,
+    "max_promo_games_per_round": 3,
+    "mg_max_tiles_points_percent": 20,
+    "http_pool_size": 10,
+    "http_idle_timeout": 600,
+    "preflight_mode": "cache",
+    "preflight_cache_ttl": 600,
+}
+
+
+class ConfigError(Exception):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+class ConfigNotFoundError(ConfigError):
+    pass
+
+
+class ConfigVersionError(ConfigError):
+    pass
+
+
+def _CheckType(value, default, name, errors):
+    if isinstance(default, bool):
+        if not isinstance(value, bool):
+            errors.append(f"{name} must be True or False")
+            return default
+    elif isinstance(default, (int, float)):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"{name} must be a number")
+            return default
+    elif isinstance(default, str):
+        if not isinstance(value, str):
+            errors.append(f"{name} must be a string")
+            return default
+    elif isinstance(default, list):
+        if not isinstance(value, (list, tuple)):
+            errors.append(f"{name} must be a list")
+            return default
+        return list(value)
+    elif isinstance(default, dict):
+        if not isinstance(value, dict):
+            errors.append(f"{name} must be a dictionary")
+            return default
+    return value
+
+
+# Account options with the defaults resolved, can be used like the old "config" dictionary
+class AccountOptions:
+    __slots__ = tuple(AccountOptionDefaults) + ("extra",)
+
+    def __init__(self, options, accountName, errors):
+        if not isinstance(options, dict):
+            errors.append(f"[{accountName}] config must be a dictionary")
+            options = {}
+
+        for key, default in AccountOptionDefaults.items():
+            value = options.get(key, default)
+            setattr(
+                self,
+                key,
+                _CheckType(value, default, f"[{accountName}] config.{key}", errors),
+            )
+
+        if self.preflight_mode not in ["always", "cache", "off"]:
+            errors.append(
+                f'[{accountName}] config.preflight_mode must be "always", "cache" or "off"'
+            )
+            self.preflight_mode = "cache"
+
+        self.extra = {
+            key: value
+            for key, value in options.items()
+            if key not in AccountOptionDefaults
+        }
+
+    def __getitem__(self, key):
+        if key in AccountOptionDefaults:
+            return getattr(self, key)
+        return self.extra[key]
+
+    def __contains__(self, key):
+        return key in AccountOptionDefaults or key in self.extra
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def ToDict(self):
+        options = {key: getattr(self, key) for key in AccountOptionDefaults}
+        options.update(self.extra)
+        return options
+
+
+# One validated entry of AccountList
+class AccountSettings:
+    __slots__ = (
+        "account_name",
+        "Authorization",
+        "UserAgent",
+        "Proxy",
+        "telegram_chat_id",
+        "config",
+    )
+
+    def __init__(self, data, index, errors):
+        if not isinstance(data, dict):
+            errors.append(f"AccountList[{index}] must be a dictionary")
+            data = {}
+
+        self.account_name = str(data.get("account_name", f"Account {index + 1}"))
+        for key in ["Authorization", "UserAgent"]:
+            value = data.get(key, "")
+            if not isinstance(value, str) or value == "":
+                errors.append(f"[{self.account_name}] {key} is missing")
+                value = ""
+            setattr(self, key, value)
+
+        self.Proxy = data.get("Proxy") or {}
+        if not isinstance(self.Proxy, dict):
+            errors.append(f"[{self.account_name}] Proxy must be a dictionary")
+            self.Proxy = {}
+
+        self.telegram_chat_id = str(data.get("telegram_chat_id", "") or "")
+        self.config = AccountOptions(data.get("config", {}), self.account_name, errors)
+
+    # Old code reads the account like a dictionary
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def Key(self):
+        return (
+            self.Authorization,
+            self.UserAgent,
+            tuple(sorted(self.Proxy.items())),
+            self.telegram_chat_id,
+            tuple(sorted(self.config.ToDict().items(), key=lambda item: item[0])),
+        )
+
+
+# Validated config, global settings are attributes
+class Settings:
+    def __init__(self, path, values):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        errors = []
+
+        version = values.get("ConfigFileVersion")
+        if version != SupportedConfigVersion:
+            raise ConfigVersionError(f"Invalid config file version: {version}")
+
+        self.values = {}
+        for key, default in GlobalDefaults.items():
+            self.values[key] = _CheckType(
+                values.get(key, default), default, key, errors
+            )
+
+        accountList = values.get("AccountList", [])
+        if not isinstance(accountList, list):
+            errors.append("AccountList must be a list")
+            accountList = []
+
+        self.accounts = []
+        names = set()
+        for index, account in enumerate(accountList):
+            settings = AccountSettings(account, index, errors)
+            if settings.account_name in names:
+                errors.append(f"[{settings.account_name}] account_name is not unique")
+            names.add(settings.account_name)
+            self.accounts.append(settings)
+
+        if errors:
+            raise ConfigError("Invalid config file", errors)
+
+    def __getattr__(self, key):
+        values = self.__dict__.get("values", {})
+        if key in values:
+            return values[key]
+        raise AttributeError(key)
+
+    # Values to use as module globals, AccountList is the list of validated accounts
+    def Globals(self):
+        values = dict(self.values)
+        values["AccountList"] = self.accounts
+        values["ConfigFileVersion"] = SupportedConfigVersion
+        return values
+
+
+def FindConfigFile(directory=None):
+    path = os.environ.get("HAMSTER_CONFIG", "")
+    if path != "":
+        if not os.path.exists(path):
+            raise ConfigNotFoundError(f"Config file {path} not found")
+        return path
+
+    if directory is None:
+        directory = os.path.dirname(os.path.abspath(__file__))
+    for name in ConfigFileNames:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    raise ConfigNotFoundError("Config file not found")
+
+
+def ReadConfigFile(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".py":
+        values = runpy.run_path(path)
+    elif extension == ".json":
+        with open(path, "r", encoding="utf-8") as file:
+            values = json.load(file)
+    elif extension in [".yaml", ".yml"]:
+        if yaml is None:
+            raise ConfigError("PyYAML is required for YAML config files")
+        with open(path, "r", encoding="utf-8") as file:
+            values = yaml.safe_load(file)
+    elif extension == ".toml":
+        if tomllib is None:
+            raise ConfigError("tomli is required for TOML config files")
+        with open(path, "rb") as file:
+            values = tomllib.load(file)
+    else:
+        raise ConfigError(f"Unsupported config file type: {extension}")
+
+    if not isinstance(values, dict):
+        raise ConfigError("The config file must contain the settings as a mapping")
+    return values
+
+
+def LoadConfig(path=None):
+    if path is None:
+        path = FindConfigFile()
+    try:
+        values = ReadConfigFile(path)
+    except ConfigError:
+        raise
+    except Exception as e:
+        raise ConfigError(f"Unable to read {path}: {e}")
+    return Settings(path, values)
+
+
+# Reloads the config when the file changes, invalid files are ignored until they are fixed
+class ConfigWatcher:
+    def __init__(self, settings, interval=5):
+        self.settings = settings
+        self.interval = interval
+        self.lastCheck = 0
+        self.lastFailedMtime = None
+
+    # Returns the new settings or None if nothing changed
+    def Poll(self, now):
+        if now - self.lastCheck < self.interval:
+            return None
+        self.lastCheck = now
+
+        try:
+            mtime = os.path.getmtime(self.settings.path)
+        except OSError:
+            return None
+        if mtime == self.settings.mtime or mtime == self.lastFailedMtime:
+            return None
+
+        try:
+            settings = LoadConfig(self.settings.path)
+        except ConfigError:
+            self.lastFailedMtime = mtime
+            raise
+
+        self.lastFailedMtime = None
+        self.settings = settings
+        return settings
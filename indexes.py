@@ -0,0 +1,47 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+
+
+# Lookup tables of the game config, built once per config version
+class ConfigIndex:
+    def __init__(self, configData):
+        configData = configData or {}
+        self.tasks = {}
+        self.streakRewards = {}
+        self.skins = {}
+
+        for task in configData.get("tasks", []):
+            self.tasks[task["id"]] = task
+            for weekRewards in task.get("rewardsByWeeksAndDays", []) or []:
+                for dayReward in weekRewards.get("days", []) or []:
+                    key = (task["id"], weekRewards.get("week"), dayReward.get("day"))
+                    self.streakRewards[key] = dayReward
+
+        for skin in configData.get("skins", []):
+            self.skins[skin["id"]] = skin
+
+    def Task(self, taskId):
+        return self.tasks.get(taskId)
+
+    def StreakReward(self, taskId, week, day):
+        return self.streakRewards.get((taskId, week, day))
+
+    def Skin(self, skinId):
+        return self.skins.get(skinId)
+
+
+# Lookup tables of an upgrades-for-buy response
+class UpgradesIndex:
+    def __init__(self, upgrades):
+        self.byId = {}
+        self.byName = {}
+        for upgrade in upgrades or []:
+            self.byId[upgrade["id"]] = upgrade
+            self.byName[upgrade["name"].strip().lower()] = upgrade
+
+    def ById(self, upgradeId):
+        return self.byId.get(upgradeId)
+
+    def ByName(self, name):
+        return self.byName.get(name.strip().lower())
@@ -0,0 +1,116 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import json
+import sqlite3
+import threading
+import time
+
+
+# Append-only journal of the progress of the accounts, kept in SQLite.
+# Every change appends a row, the last row of an (account, kind, key) wins and
+# a row without data removes the entry. Old rows are compacted when the journal is opened
+# and after every compact_every new rows.
+# The entries found when the journal is opened belong to the previous run of the bot,
+# they can be taken over once with TakeOrphan (for example unfinished promo key sessions).
+class AccountJournal:
+    def __init__(self, path="journal.db", compact_every=10000):
+        self.path = path
+        self.compact_every = compact_every
+        self.appended = 0
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS journal (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                account TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data TEXT,
+                created_at INTEGER NOT NULL
+            )
+            """
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS journal_entries ON journal (account, kind, key, id)"
+        )
+        self.Compact()
+
+        self.orphans = {}
+        for account, kind, key, data in self.db.execute(
+            "SELECT account, kind, key, data FROM journal ORDER BY id"
+        ):
+            self.orphans.setdefault((account, kind), {})[key] = json.loads(data)
+
+    def Record(self, account, kind, key, data):
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO journal (account, kind, key, data, created_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    account,
+                    kind,
+                    key,
+                    None if data is None else json.dumps(data),
+                    int(time.time()),
+                ),
+            )
+            self.appended += 1
+            compact = self.appended >= self.compact_every
+            if compact:
+                self.appended = 0
+
+        if compact:
+            self.Compact()
+
+    def Forget(self, account, kind, key):
+        self.Record(account, kind, key, None)
+
+    # Last data of the entry, None if it does not exist or was removed
+    def Get(self, account, kind, key=""):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT data FROM journal WHERE account = ? AND kind = ? AND key = ? ORDER BY id DESC LIMIT 1",
+                (account, kind, key),
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    # Take over an entry of the previous run, returns (key, data) or None.
+    # match filters the entries by their data.
+    def TakeOrphan(self, account, kind, match=None):
+        with self.lock:
+            entries = self.orphans.get((account, kind), {})
+            for key, data in entries.items():
+                if match is None or match(data):
+                    del entries[key]
+                    return key, data
+        return None
+
+    # Let an entry of this run that was stopped before it finished be taken over with TakeOrphan
+    def AddOrphan(self, account, kind, key, data):
+        with self.lock:
+            self.orphans.setdefault((account, kind), {})[key] = data
+
+    # Keep only the last row of every entry and drop the removed entries
+    def Compact(self):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.execute(
+                    "DELETE FROM journal WHERE id NOT IN (SELECT MAX(id) FROM journal GROUP BY account, kind, key)"
+                )
+                self.db.execute("DELETE FROM journal WHERE data IS NULL")
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def Close(self):
+        with self.lock:
+            self.db.close()
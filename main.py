@@ -2,25 +2,57 @@
 # Date: 2024
 # Github: https://github.com/masterking32
 
+import argparse
 import asyncio
 import datetime
 import json
 import logging
+import logging.handlers
 import random
+import threading
 import time
 import requests
 from colorlog import ColoredFormatter
 import uuid
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from utilities import *
 from promogames import *
 import sys
 from banner import show_banner
+from sessions import AccountSession
+from preflight import PreflightCache
+from promopipeline import PromoKeyPipeline
+from promostore import PromoCodeStore
+from scheduler import AccountScheduler, PurchaseIntents
+from planner import UpgradePlanner
+from metrics import metrics, MetricsServer, ProxyLabel
+from shards import AssignShards, ShardSupervisor
+from ratelimit import RateLimiter, ProxyKey
+from retrypolicy import RetryPolicy, CircuitBreaker
+from timeouts import AdaptiveTimeouts
+from taskgraph import RunTaskGraph
+from journal import AccountJournal
+from statediff import KnownState
+from tapengine import TapPlanner
+from cardscoring import CardTable, CostModels
+from urllib.parse import urlparse
+from telegramlog import TelegramLogDispatcher
+from configcache import ConfigVersionCache
+from indexes import ConfigIndex, UpgradesIndex
+from configloader import (
+    LoadConfig,
+    ConfigWatcher,
+    ConfigError,
+    ConfigNotFoundError,
+    ConfigVersionError,
+    RestartRequiredSettings,
+)
 import warna as w
 
 try:
-    from config import *
-except ImportError:
+    settings = LoadConfig()
+except ConfigNotFoundError:
     clear_screen()
     print(
         f"""
@@ -32,8 +64,7 @@ except ImportError:
           """
     )
     exit()
-
-if "ConfigFileVersion" not in locals() or ConfigFileVersion != 1:
+except ConfigVersionError:
     clear_screen()
     print(
         f"""
@@ -46,6 +77,85 @@ if "ConfigFileVersion" not in locals() or ConfigFileVersion != 1:
     """
     )
     exit()
+except ConfigError as e:
+    print(f"\033[31;1m{e}\033[0m")
+    for error in e.errors:
+        print(f" - {error}")
+    exit()
+
+# Config values are module globals, missing settings already have their defaults
+globals().update(settings.Globals())
+
+# Telegram logs are batched and sent by a background thread
+telegramLogDispatcher = TelegramLogDispatcher(
+    telegramBotLogging["bot_token"],
+    telegramBotLogging.get("flush_interval", 3),
+    telegramBotLogging.get("queue_size", 1000),
+)
+if telegramBotLogging["is_active"] and telegramBotLogging["bot_token"] != "":
+    telegramLogDispatcher.Start()
+
+# Versioned game config shared by all accounts
+configVersionCache = ConfigVersionCache(ConfigCacheDir)
+
+# Progress of the accounts, used to continue after a restart
+accountJournal = None
+if stateJournal.get("file", "") != "":
+    accountJournal = AccountJournal(stateJournal["file"])
+
+# Request budgets per proxy and API host, shared by all accounts of the process
+rateLimiter = RateLimiter(
+    rateLimits.get("proxy_rate", 0),
+    rateLimits.get("proxy_burst", 10),
+    rateLimits.get("proxy_connections", 0),
+    rateLimits.get("hosts", {}),
+)
+
+# Retries of failed requests and circuit breakers of the API hosts
+requestRetryPolicy = RetryPolicy(
+    httpRetry.get("max_attempts", 3),
+    httpRetry.get("base_delay", 1),
+    httpRetry.get("max_delay", 30),
+)
+hostCircuitBreaker = CircuitBreaker(
+    httpRetry.get("breaker_failures", 5),
+    httpRetry.get("breaker_open_seconds", 60),
+)
+
+# Connect and read timeouts adapted to the latency of each endpoint and proxy
+adaptiveTimeouts = AdaptiveTimeouts(
+    requestTimeouts.get("connect", 5),
+    requestTimeouts.get("read_min", 3),
+    requestTimeouts.get("read_max", 30),
+    requestTimeouts.get("p99_multiplier", 3),
+)
+
+# When the taps are sent, shared by all accounts
+tapPlanner = TapPlanner(
+    tapEngine.get("min_fill", 0.9),
+    tapEngine.get("wake_margin", 60),
+)
+
+# Workers sending the first reads of the accounts at the same time, shared by all accounts
+bootstrapExecutor = None
+if BootstrapWorkers > 0:
+    bootstrapExecutor = ThreadPoolExecutor(
+        max_workers=BootstrapWorkers, thread_name_prefix="bootstrap"
+    )
+# The bootstrap calls of an account can finish at the same time
+accountStatsLock = threading.Lock()
+
+# Set in the worker processes of the --shards mode
+ShardIndex = 0
+ShardCount = 1
+shardMetricsQueue = None
+# Seconds between two metrics deltas sent by a shard
+ShardMetricsInterval = 10
+shardMetricsSentAt = 0
+
+# API base URLs, the benchmark replaces them with a local mock server
+HamsterApiUrl = "https://api.hamsterkombatgame.io"
+GamePromoApiUrl = "https://api.gamepromo.io"
 
 # ---------------------------------------------#
 # Logging configuration
@@ -68,6 +178,45 @@ log.addHandler(stream)
 
 
 class HamsterKombatAccount:
+    # Hundreds of accounts can run in one process, keep the state of each account small.
+    # Only the numbers used by the bot are kept from the responses, the game config is shared.
+    __slots__ = (
+        "account_name",
+        "Authorization",
+        "UserAgent",
+        "Proxy",
+        "config",
+        "settings",
+        "isAndroidDevice",
+        "balanceCoins",
+        "availableTaps",
+        "maxTaps",
+        "ProfitPerHour",
+        "earnPassivePerHour",
+        "SpendTokens",
+        "telegram_chat_id",
+        "totalKeys",
+        "balanceKeys",
+        "configVersion",
+        "configIndex",
+        "upgradesIndex",
+        "promoPipeline",
+        "promoStore",
+        "tapsRecoverPerSec",
+        "tapsUpdated",
+        "pendingSettings",
+        "removed",
+        "wakeHints",
+        "nextFullPass",
+        "upgradePlanner",
+        "httpSession",
+        "preflightCache",
+        "queueWait",
+        "roundDeadline",
+        "knownState",
+        "purchaseIntents",
+    )
+
     def __init__(self, AccountData):
         self.account_name = AccountData["account_name"]
         self.Authorization = AccountData["Authorization"]
@@ -81,18 +230,78 @@ class HamsterKombatAccount:
         self.ProfitPerHour = 0
         self.earnPassivePerHour = 0
         self.SpendTokens = 0
-        self.account_data = None
         self.telegram_chat_id = AccountData["telegram_chat_id"]
         self.totalKeys = 0
         self.balanceKeys = 0
         self.configVersion = ""
-        self.configData = ""
+        self.configIndex = ConfigIndex({})
+        self.upgradesIndex = UpgradesIndex([])
+        self.promoPipeline = None
+        self.promoStore = None
+        self.tapsRecoverPerSec = 0
+        self.tapsUpdated = 0
+        self.settings = AccountData
+        self.pendingSettings = None
+        self.removed = False
+        self.queueWait = 0
+        self.roundDeadline = 0
+        self.wakeHints = {}
+        self.nextFullPass = 0
+        self.knownState = KnownState()
+        self.purchaseIntents = PurchaseIntents()
+        self.upgradePlanner = UpgradePlanner(
+            self.GetConfig("upgrade_planner_horizon", 24),
+            self.GetConfig("upgrade_planner_lookahead", 5),
+        )
+        self.httpSession = AccountSession(
+            self.Proxy,
+            self.GetConfig("http_pool_size", 10),
+            self.GetConfig("http_idle_timeout", 600),
+        )
+        self.preflightCache = PreflightCache(
+            self.GetConfig("preflight_mode", "cache"),
+            self.GetConfig("preflight_cache_ttl", 600),
+        )
+
+    # New settings from a config reload, they are used from the next round
+    def ApplySettings(self, AccountData):
+        self.pendingSettings = AccountData
+
+    def _UpdateSettings(self, AccountData):
+        self.settings = AccountData
+        self.account_name = AccountData["account_name"]
+        self.Authorization = AccountData["Authorization"]
+        self.UserAgent = AccountData["UserAgent"]
+        self.Proxy = AccountData["Proxy"]
+        self.config = AccountData["config"]
+        self.telegram_chat_id = AccountData["telegram_chat_id"]
+        self.isAndroidDevice = "Android" in self.UserAgent
+        # The account options decide what is left to do
+        self.knownState.Forget()
+        self.upgradePlanner = UpgradePlanner(
+            self.GetConfig("upgrade_planner_horizon", 24),
+            self.GetConfig("upgrade_planner_lookahead", 5),
+        )
+        self.preflightCache = PreflightCache(
+            self.GetConfig("preflight_mode", "cache"),
+            self.GetConfig("preflight_cache_ttl", 600),
+        )
+        # Used when the session is created again
+        self.httpSession.pool_size = max(int(self.GetConfig("http_pool_size", 10)), 1)
+        self.httpSession.idle_timeout = self.GetConfig("http_idle_timeout", 600)
 
     def GetConfig(self, key, default=None):
         if key in self.config:
             return self.config[key]
         return default
 
+    # Pause between two actions, headless mode only keeps a short random delay
+    def Pause(self, seconds):
+        if HeadlessMode:
+            time.sleep(random.uniform(*HeadlessActionDelay))
+        else:
+            time.sleep(seconds)
+
     def SendTelegramLog(self, message, level="other_errors"):
         if (
             not telegramBotLogging["is_active"]
@@ -107,14 +316,8 @@ class HamsterKombatAccount:
         ):
             return
 
-        try:
-            requests.get(
-                f"https://api.telegram.org/bot{telegramBotLogging['bot_token']}/sendMessage?chat_id={self.telegram_chat_id}&text={message}"
-            )
-        except Exception as e:
-            log.error(
-                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✖ TelegramLog error: {w.r}{e}"
-            )
+        # Sent in the background, a slow Telegram API does not stall the account
+        telegramLogDispatcher.Send(self.telegram_chat_id, message)
 
     # Send HTTP requests
     def HttpRequest(
@@ -152,28 +355,113 @@ class HamsterKombatAccount:
         for key, value in headers.items():
             defaultHeaders[key] = value
 
-        try:
-            if method == "GET":
-                response = requests.get(
-                    url, headers=defaultHeaders, proxies=self.Proxy, timeout=30
-                )
-            elif method == "POST":
-                response = requests.post(
-                    url, headers=defaultHeaders, data=payload, proxies=self.Proxy, timeout=30
-                )
-            elif method == "OPTIONS":
-                response = requests.options(
-                    url, headers=defaultHeaders, proxies=self.Proxy, timeout=30
+        # Skip the preflight request if it is disabled or still cached
+        if method == "OPTIONS" and not self.preflightCache.ShouldSend(url, headers):
+            return True
+
+        if method not in ["GET", "POST", "OPTIONS"]:
+            log.error(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✖ Invalid method: {w.r}{method}"
+            )
+            self.SendTelegramLog(
+                f"[{self.account_name}]: ✖ Invalid method: {method}",
+                "http_errors",
+            )
+            return None
+
+        host = urlparse(url).hostname
+        circuit = (ProxyKey(self.Proxy), host)
+        attempt = 0
+        while True:
+            attempt += 1
+            # Slow accounts stop their round instead of holding a worker
+            connectTimeout, readTimeout = adaptiveTimeouts.Timeout(url, self.Proxy)
+            if self.roundDeadline > 0:
+                remaining = self.roundDeadline - time.time()
+                if remaining <= 0:
+                    if not ignore_errors:
+                        log.error(
+                            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✖ Round deadline reached, request skipped."
+                        )
+                    return None
+                readTimeout = min(readTimeout, remaining)
+
+            # Calls to a host that keeps failing through this proxy are paused for every account,
+            # the round is run again once the circuit lets requests through.
+            # Allow can start the half open trial, every allowed request has to be recorded.
+            if not hostCircuitBreaker.Allow(circuit):
+                self.AddWakeHint("breaker", hostCircuitBreaker.RetryIn(circuit))
+                if not ignore_errors:
+                    log.warning(
+                        f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ⏸ {w.y}{host}{w.rs} is failing through {w.y}{ProxyLabel(self.Proxy)}{w.rs}, request skipped."
+                    )
+                return None
+
+            response = None
+            error = None
+            requestStart = time.time()
+            try:
+                session = self.httpSession.GetSession(self.Proxy)
+                # Wait for the request budget of the proxy and the API host
+                with rateLimiter.Request(self.Proxy, url) as waited:
+                    with accountStatsLock:
+                        self.queueWait += waited
+                    requestStart = time.time()
+                    response = session.request(
+                        method,
+                        url,
+                        headers=defaultHeaders,
+                        # Only POST requests send the payload
+                        data=payload if method == "POST" else None,
+                        proxies=self.Proxy,
+                        timeout=(connectTimeout, readTimeout),
+                    )
+                adaptiveTimeouts.Observe(url, self.Proxy, time.time() - requestStart)
+            except requests.Timeout as e:
+                error = e
+                # A read timeout counts as a sample at the timeout, so the timeout grows
+                # again when the latency of the endpoint goes up
+                if not isinstance(e, requests.ConnectTimeout):
+                    adaptiveTimeouts.Observe(url, self.Proxy, readTimeout)
+                log.warning(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🐢 {urlparse(url).path} timed out after {w.y}{time.time() - requestStart:.1f}{w.rs} seconds through {w.y}{ProxyLabel(self.Proxy)}{w.rs}."
                 )
-            else:
+            except Exception as e:
+                error = e
+
+            metrics.ObserveRequest(
+                url,
+                method,
+                self.account_name,
+                self.Proxy,
+                response.status_code if response is not None else "error",
+                time.time() - requestStart,
+                len(payload) if isinstance(payload, (str, bytes)) else 0,
+                len(response.content) if response is not None else 0,
+            )
+
+            if hostCircuitBreaker.Record(
+                circuit, response is not None and response.status_code < 500
+            ):
                 log.error(
-                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✖ Invalid method: {w.r}{method}"
-                )
-                self.SendTelegramLog(
-                    f"[{self.account_name}]: ✖ Invalid method: {method}",
-                    "http_errors",
+                    f"✖ Too many failures from {w.r}{host}{w.rs} through {w.r}{ProxyLabel(self.Proxy)}{w.rs}, pausing its requests for {hostCircuitBreaker.open_seconds} seconds."
                 )
-                return None
+
+            if not requestRetryPolicy.ShouldRetry(
+                method, url, response, error, attempt
+            ):
+                break
+
+            delay = requestRetryPolicy.Delay(attempt, response)
+            metrics.ObserveRetry(url, method, self.account_name, self.Proxy)
+            log.warning(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ⟳ {method} {urlparse(url).path} failed ({error if error is not None else response.status_code}), retrying in {delay:.1f} seconds."
+            )
+            time.sleep(delay)
+
+        try:
+            if error is not None:
+                raise error
 
             if response.status_code != validStatusCodes:
                 if ignore_errors:
@@ -195,6 +483,9 @@ class HamsterKombatAccount:
                 self.configVersion = response.headers["config-version"]
 
             if method == "OPTIONS":
+                self.preflightCache.Store(
+                    url, headers, response.headers.get("Access-Control-Max-Age")
+                )
                 return True
 
             return response.json()
@@ -205,9 +496,171 @@ class HamsterKombatAccount:
             self.SendTelegramLog(f"[{self.account_name}]: ✖ Error: {e}", "http_errors")
             return None
 
+    def StartRound(self):
+        if self.pendingSettings is not None:
+            self._UpdateSettings(self.pendingSettings)
+            self.pendingSettings = None
+        self.httpSession.StartRound()
+        self.preflightCache.StartRound()
+        self.wakeHints = {}
+        self.queueWait = 0
+        self.roundDeadline = 0
+        if AccountRoundDeadline > 0:
+            self.roundDeadline = time.time() + AccountRoundDeadline
+
+        # The totals of a round that was interrupted by a restart are continued
+        roundState = self.JournalGet("round")
+        if roundState is not None and not roundState.get("finished", True):
+            self.ProfitPerHour = roundState.get("ProfitPerHour", 0)
+            self.SpendTokens = roundState.get("SpendTokens", 0)
+        else:
+            self.ProfitPerHour = 0
+            self.SpendTokens = 0
+        self.JournalRound(False)
+
+    # Drop the responses of the round, only the numbers are kept between rounds
+    def RoundDeadlinePassed(self):
+        return self.roundDeadline > 0 and time.time() >= self.roundDeadline
+
+    def EndRound(self):
+        self.upgradesIndex = UpgradesIndex([])
+        # The promo key workers keep sending requests after the round
+        self.roundDeadline = 0
+        self.JournalRound(True)
+
+    def JournalRecord(self, kind, key, data):
+        if accountJournal is not None:
+            accountJournal.Record(self.account_name, kind, key, data)
+
+    def JournalForget(self, kind, key):
+        if accountJournal is not None:
+            accountJournal.Forget(self.account_name, kind, key)
+
+    def JournalGet(self, kind, key=""):
+        if accountJournal is None:
+            return None
+        return accountJournal.Get(self.account_name, kind, key)
+
+    # Save the progress of the round, dueTime and dueReasons are the next wake-up of the account
+    def JournalRound(self, finished, dueTime=None, dueReasons=None):
+        self.JournalRecord(
+            "round",
+            "",
+            {
+                "finished": finished,
+                "ProfitPerHour": self.ProfitPerHour,
+                "SpendTokens": self.SpendTokens,
+                "configVersion": self.configVersion,
+                "nextFullPass": self.nextFullPass,
+                "dueTime": dueTime,
+                "dueReasons": dueReasons,
+            },
+        )
+
+    # Returns the first wake-up of the account as (dueTime, reasons).
+    # The schedule of the previous run is continued, unfinished rounds run again right away.
+    def ResumeSchedule(self, now):
+        roundState = self.JournalGet("round")
+        if roundState is None:
+            return now, ["full"]
+
+        self.configVersion = roundState.get("configVersion", "")
+        if not roundState.get("finished", False) or roundState.get("dueTime") is None:
+            return now, ["full"]
+
+        self.nextFullPass = roundState.get("nextFullPass", 0)
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 📒 Continuing the schedule of the previous run."
+        )
+        return max(roundState["dueTime"], now), roundState["dueReasons"]
+
+    # Take over a playground key session or key of the previous run, returns (key, data) or None
+    # The entry is continued by the next round with TakePromoOrphan
+    def JournalPause(self, kind, key, data):
+        if accountJournal is not None:
+            accountJournal.AddOrphan(self.account_name, kind, key, data)
+
+    def TakePromoOrphan(self, kind, promoId):
+        if accountJournal is None:
+            return None
+
+        while True:
+            orphan = accountJournal.TakeOrphan(
+                self.account_name, kind, lambda data: data.get("promoId") == promoId
+            )
+            if orphan is None:
+                return None
+            if time.time() - orphan[1].get("createdAt", 0) <= stateJournal.get(
+                "promo_session_max_age", 3600
+            ):
+                return orphan
+            accountJournal.Forget(self.account_name, kind, orphan[0])
+
+    def TaskCheckedRecently(self, taskId):
+        taskState = self.JournalGet("task", taskId)
+        return taskState is not None and time.time() - taskState.get(
+            "checkedAt", 0
+        ) < stateJournal.get("task_recheck_time", 3600)
+
+    def IsStateKnown(self, name):
+        return knownStateCache.get("enabled", True) and self.knownState.IsKnown(
+            name, time.time()
+        )
+
+    # Skip the endpoint until its state can change, daily states change at the daily reset
+    def RememberState(self, name, daily=True, remainSeconds=None):
+        if not knownStateCache.get("enabled", True):
+            return
+
+        self.knownState.Remember(
+            name,
+            time.time(),
+            knownStateCache.get("max_age", 21600),
+            knownStateCache.get("daily_reset_hour", 12) if daily else None,
+            remainSeconds,
+        )
+
+    # True when the tasks response leaves nothing to do for the account
+    def TasksDone(self, tasks):
+        for task in tasks:
+            if task.get("isCompleted", False):
+                continue
+            if task["id"] == "streak_days_special":
+                if self.config["auto_get_daily_task"]:
+                    return False
+            elif (
+                self.config["auto_get_task"]
+                and task["id"] not in ["select_exchange", "invite_friends"]
+                and not self.TaskCheckedRecently(task["id"])
+            ):
+                return False
+        return True
+
+    # Remember in how many seconds useful work is available again, used by the account scheduler
+    def AddWakeHint(self, reason, seconds):
+        if seconds is None or seconds < 0:
+            return
+
+        if reason not in self.wakeHints or seconds < self.wakeHints[reason]:
+            self.wakeHints[reason] = seconds
+
+    def LogRoundSummary(self):
+        stats = self.httpSession.RoundStats()
+        preflightStats = self.preflightCache.RoundStats()
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 📊 Round summary: {w.b}{stats['requests']}{w.rs} requests | New connections: {w.y}{stats['new_connections']}{w.rs} | Reused connections: {w.g}{stats['reused_connections']}"
+        )
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ Preflights sent: {w.y}{preflightStats['sent']}{w.rs} | Cached: {w.g}{preflightStats['cached']}{w.rs} | Skipped: {w.g}{preflightStats['skipped']}"
+        )
+        if self.queueWait > 0:
+            log.info(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ Waited {w.y}{self.queueWait:.1f}{w.rs} seconds for the proxy request budget."
+            )
+
     # Sending sync request
     def syncRequest(self):
-        url = "https://api.hamsterkombatgame.io/clicker/sync"
+        url = f"{HamsterApiUrl}/clicker/sync"
         headers = {
             "Access-Control-Request-Headers": self.Authorization,
             "Access-Control-Request-Method": "POST",
@@ -225,7 +678,7 @@ class HamsterKombatAccount:
 
     # Get list of upgrades to buy
     def UpgradesForBuyRequest(self):
-        url = "https://api.hamsterkombatgame.io/clicker/upgrades-for-buy"
+        url = f"{HamsterApiUrl}/clicker/upgrades-for-buy"
         headers = {
             "Access-Control-Request-Headers": "authorization",
             "Access-Control-Request-Method": "POST",
@@ -239,11 +692,14 @@ class HamsterKombatAccount:
         }
 
         # Send POST request
-        return self.HttpRequest(url, headers, "POST", 200)
+        response = self.HttpRequest(url, headers, "POST", 200)
+        if response is not None:
+            self.upgradesIndex = UpgradesIndex(response.get("upgradesForBuy", []))
+        return response
 
     # Buy an upgrade
     def BuyUpgradeRequest(self, UpgradeId):
-        url = "https://api.hamsterkombatgame.io/clicker/buy-upgrade"
+        url = f"{HamsterApiUrl}/clicker/buy-upgrade"
         headers = {
             "Access-Control-Request-Headers": "authorization,content-type",
             "Access-Control-Request-Method": "POST",
@@ -270,7 +726,7 @@ class HamsterKombatAccount:
 
     # Tap the hamster
     def TapRequest(self, tap_count):
-        url = "https://api.hamsterkombatgame.io/clicker/tap"
+        url = f"{HamsterApiUrl}/clicker/tap"
         headers = {
             "Access-Control-Request-Headers": "authorization,content-type",
             "Access-Control-Request-Method": "POST",
@@ -298,7 +754,7 @@ class HamsterKombatAccount:
 
     # Get list of boosts to buy
     def BoostsToBuyListRequest(self):
-        url = "https://api.hamsterkombatgame.io/clicker/boosts-for-buy"
+        url = f"{HamsterApiUrl}/clicker/boosts-for-buy"
         headers = {
             "Access-Control-Request-Headers": "authorization",
             "Access-Control-Request-Method": "POST",
@@ -316,7 +772,7 @@ class HamsterKombatAccount:
 
     # Buy a boost
     def BuyBoostRequest(self, boost_id):
-        url = "https://api.hamsterkombatgame.io/clicker/buy-boost"
+        url = f"{HamsterApiUrl}/clicker/buy-boost"
         headers = {
             "Access-Control-Request-Headers": "authorization,content-type",
             "Access-Control-Request-Method": "POST",
@@ -373,28 +829,63 @@ class HamsterKombatAccount:
             )
             return False
 
-        self.account_data = account_data
-        self.balanceCoins = account_data["clickerUser"]["balanceCoins"]
-        self.availableTaps = account_data["clickerUser"]["availableTaps"]
-        self.maxTaps = account_data["clickerUser"]["maxTaps"]
-        self.earnPassivePerHour = account_data["clickerUser"]["earnPassivePerHour"]
-        if "balanceKeys" in account_data["clickerUser"]:
-            self.balanceKeys = account_data["clickerUser"]["balanceKeys"]
+        self.UpdateClickerUser(account_data["clickerUser"])
+        return account_data
+
+    # Keep the numbers of the clickerUser of a sync, tap or boost response
+    def UpdateClickerUser(self, clickerUser):
+        self.balanceCoins = clickerUser["balanceCoins"]
+        self.availableTaps = clickerUser["availableTaps"]
+        self.maxTaps = clickerUser["maxTaps"]
+        self.earnPassivePerHour = clickerUser["earnPassivePerHour"]
+        if "balanceKeys" in clickerUser:
+            self.balanceKeys = clickerUser["balanceKeys"]
         else:
             self.balanceKeys = 0
 
-        if "totalKeys" in account_data["clickerUser"]:
-            self.totalKeys = account_data["clickerUser"]["totalKeys"]
+        if "totalKeys" in clickerUser:
+            self.totalKeys = clickerUser["totalKeys"]
         else:
             self.totalKeys = 0
 
-        return account_data
+        self.tapsRecoverPerSec = clickerUser.get("tapsRecoverPerSec", 0)
+        self.tapsUpdated = time.time()
+        tapsWakeIn = tapPlanner.WakeIn(
+            self.availableTaps, self.maxTaps, self.tapsRecoverPerSec
+        )
+        if self.GetConfig("auto_tap", False) and tapsWakeIn is not None:
+            # Wake up shortly before the energy is full
+            self.wakeHints["taps"] = tapsWakeIn
+
+    # Energy of the account now, predicted from the last account data
+    def PredictTaps(self):
+        return tapPlanner.Energy(
+            self.availableTaps,
+            self.maxTaps,
+            self.tapsRecoverPerSec,
+            time.time() - self.tapsUpdated,
+        )
+
+    # Tap the energy, the tap response has the new account data
+    def SendTaps(self, count):
+        response = self.TapRequest(count)
+        if isinstance(response, dict) and isinstance(response.get("clickerUser"), dict):
+            self.UpdateClickerUser(response["clickerUser"])
+        else:
+            self.getAccountData()
+        return response
 
     def BuyFreeTapBoostIfAvailable(self):
         log.info(
             f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🚀 Checking for free tap boost."
         )
 
+        if self.IsStateKnown("boosts"):
+            log.info(
+                f"\033[1;34m{w.rs}{w.g}[{self.account_name}]{w.rs}: 😓 No free boosts available"
+            )
+            return False
+
         BoostList = self.BoostsToBuyListRequest()
         if BoostList is None:
             log.error(
@@ -422,8 +913,15 @@ class HamsterKombatAccount:
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ⭐ Free boost found, attempting to buy."
             )
-            time.sleep(5)
-            self.BuyBoostRequest(BoostForTapList["id"])
+            self.Pause(5)
+            boostResponse = self.BuyBoostRequest(BoostForTapList["id"])
+            # The boost refilled the energy
+            if isinstance(boostResponse, dict) and isinstance(
+                boostResponse.get("clickerUser"), dict
+            ):
+                self.UpdateClickerUser(boostResponse["clickerUser"])
+            else:
+                self.getAccountData()
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 💸 Free boost bought successfully"
             )
@@ -432,11 +930,18 @@ class HamsterKombatAccount:
             log.info(
                 f"\033[1;34m{w.rs}{w.g}[{self.account_name}]{w.rs}: 😓 No free boosts available"
             )
+            # The free boosts come back after their cooldown or at the daily reset
+            if BoostForTapList is not None and BoostForTapList.get(
+                "cooldownSeconds", 0
+            ):
+                self.RememberState("boosts", False, BoostForTapList["cooldownSeconds"])
+            else:
+                self.RememberState("boosts", True)
 
         return False
 
     def IPRequest(self):
-        url = "https://api.hamsterkombatgame.io/ip"
+        url = f"{HamsterApiUrl}/ip"
         headers = {
             "Access-Control-Request-Headers": "authorization",
             "Access-Control-Request-Method": "GET",
@@ -453,7 +958,7 @@ class HamsterKombatAccount:
         return self.HttpRequest(url, headers, "GET", 200)
 
     def GetSkins(self):
-        url = "https://api.hamsterkombatgame.io/clicker/get-skin"
+        url = f"{HamsterApiUrl}/clicker/get-skin"
         headers = {
             "Access-Control-Request-Headers": "authorization,content-type",
             "Access-Control-Request-Method": "POST",
@@ -472,7 +977,7 @@ class HamsterKombatAccount:
         return self.HttpRequest(url, headers, "POST", 200, "{}")
 
     def BuySkin(self, skinId):
-        url = "https://api.hamsterkombatgame.io/clicker/buy-skin"
+        url = f"{HamsterApiUrl}/clicker/buy-skin"
         headers = {
             "Access-Control-Request-Headers": "authorization,content-type",
             "Access-Control-Request-Method": "POST",
@@ -498,25 +1003,16 @@ class HamsterKombatAccount:
         return self.HttpRequest(url, headers, "POST", 200, payload=payload)
 
     def GetTaskReward(self, taskObj):
-        if not self.configData:
+        if not self.configIndex.tasks:
             return "Unable to get reward data"
         try:
-            tasksData = self.configData.get("tasks", [])
             reward = ""
-            currentTaskData = next(
-                (item for item in tasksData if item["id"] == taskObj["id"]), None
-            )
+            currentTaskData = self.configIndex.Task(taskObj["id"])
             if currentTaskData.get("id") == "streak_days_special":
                 week = taskObj.get("weeks")
                 day = taskObj.get("days")
-                rewardsByWeeksAndDays = currentTaskData.get("rewardsByWeeksAndDays", [])
-                streakTaskRewards = next(
-                    (item for item in rewardsByWeeksAndDays if item["week"] == week),
-                    None,
-                )
-                streakTaskDays = streakTaskRewards.get("days")
-                streakRewardObject = next(
-                    (item for item in streakTaskDays if item["day"] == day), None
+                streakRewardObject = self.configIndex.StreakReward(
+                    currentTaskData["id"], week, day
                 )
                 rewardType = next(
                     (
@@ -527,15 +1023,7 @@ class HamsterKombatAccount:
                     None,
                 )
                 if rewardType == "skinId":
-                    skinsData = self.configData.get("skins", [])
-                    rewardSkin = next(
-                        (
-                            item
-                            for item in skinsData
-                            if item["id"] == streakRewardObject[rewardType]
-                        ),
-                        None,
-                    )
+                    rewardSkin = self.configIndex.Skin(streakRewardObject[rewardType])
                     rewardSkinName = rewardSkin.get("name", "")
                 reward = (
                     (
@@ -611,6 +1099,9 @@ class HamsterKombatAccount:
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ Daily combo already claimed.\033[0m"
             )
+            self.RememberState(
+                "combo", True, upgradesResponse["dailyCombo"].get("remainSeconds")
+            )
             return
 
         currentComboLength = len(
@@ -622,12 +1113,11 @@ class HamsterKombatAccount:
             if claimResponse:
                 return
 
-        comboCardNames = [card["card_name"].strip().lower() for card in comboCards]
-        comboUpgrades = [
-            upgrade
-            for upgrade in upgradesResponse.get("upgradesForBuy", [])
-            if upgrade["name"].lower() in comboCardNames
-        ]
+        comboUpgrades = []
+        for card in comboCards:
+            upgrade = self.upgradesIndex.ByName(card["card_name"])
+            if upgrade is not None and upgrade not in comboUpgrades:
+                comboUpgrades.append(upgrade)
         availableUpgrades = [
             card
             for card in comboUpgrades
@@ -657,15 +1147,8 @@ class HamsterKombatAccount:
                     msg = f"{w.rs}{w.g}[{self.account_name}]{w.rs}: To unlock {card['name']} card requires "
                     conditionType = card.get("condition").get("_type")
                     if conditionType == "ByUpgrade":
-                        reqUpgrade = next(
-                            (
-                                upgrade
-                                for upgrade in upgradesResponse.get(
-                                    "upgradesForBuy", []
-                                )
-                                if upgrade["id"] == card["condition"]["upgradeId"]
-                            ),
-                            None,
+                        reqUpgrade = self.upgradesIndex.ById(
+                            card["condition"]["upgradeId"]
                         )
                         msg += (
                             f"{reqUpgrade['name']} Lvl: {card['condition']['level']}."
@@ -700,7 +1183,7 @@ class HamsterKombatAccount:
 
         buyResult = None
         for card in upgradesForBuy:
-            time.sleep(2)
+            self.Pause(2)
             if card.get("cooldownSeconds", 0) > 0:
                 log.warning(
                     f"{w.rs}{w.g}[{self.account_name}]{w.rs}: The card {card['name']} in cooldown, purchase postponed to next loop."
@@ -744,7 +1227,7 @@ class HamsterKombatAccount:
             claimResponse = self.ClaimDailyComboRequest()
 
     def ClaimDailyComboRequest(self):
-        url = "https://api.hamsterkombatgame.io/clicker/claim-daily-combo"
+        url = f"{HamsterApiUrl}/clicker/claim-daily-combo"
         headers = {
             "Access-Control-Request-Headers": "authorization,content-type",
             "Access-Control-Request-Method": "POST",
@@ -782,7 +1265,7 @@ class HamsterKombatAccount:
             return True
 
     def AccountInfoTelegramRequest(self):
-        url = "https://api.hamsterkombatgame.io/auth/account-info"
+        url = f"{HamsterApiUrl}/auth/account-info"
         headers = {
             "Access-Control-Request-Headers": "authorization",
             "Access-Control-Request-Method": "POST",
@@ -799,7 +1282,7 @@ class HamsterKombatAccount:
         return self.HttpRequest(url, headers, "POST", 200)
 
     def ListTasksRequest(self):
-        url = "https://api.hamsterkombatgame.io/clicker/list-tasks"
+        url = f"{HamsterApiUrl}/clicker/list-tasks"
         headers = {
             "Access-Control-Request-Headers": "authorization",
             "Access-Control-Request-Method": "POST",
@@ -816,7 +1299,7 @@ class HamsterKombatAccount:
         return self.HttpRequest(url, headers, "POST", 200)
 
     def GetListAirDropTasksRequest(self):
-        url = "https://api.hamsterkombatgame.io/clicker/list-airdrop-tasks"
+        url = f"{HamsterApiUrl}/clicker/list-airdrop-tasks"
         headers = {
             "Access-Control-Request-Headers": "authorization",
             "Access-Control-Request-Method": "POST",
@@ -833,7 +1316,7 @@ class HamsterKombatAccount:
         return self.HttpRequest(url, headers, "POST", 200)
 
     def GetAccountConfigRequest(self):
-        url = "https://api.hamsterkombatgame.io/clicker/config"
+        url = f"{HamsterApiUrl}/clicker/config"
         headers = {
             "Access-Control-Request-Headers": "authorization",
             "Access-Control-Request-Method": "POST",
@@ -853,7 +1336,13 @@ class HamsterKombatAccount:
         if self.configVersion == "":
             return None
 
-        url = f"https://api.hamsterkombatgame.io/clicker/config/{self.configVersion}"
+        # Only the first account that sees a new version downloads it
+        return configVersionCache.Get(
+            self.configVersion, self.FetchAccountConfigVersionRequest
+        )
+
+    def FetchAccountConfigVersionRequest(self):
+        url = f"{HamsterApiUrl}/clicker/config/{self.configVersion}"
         headers = {
             "Access-Control-Request-Headers": "authorization",
             "Access-Control-Request-Method": "GET",
@@ -870,7 +1359,7 @@ class HamsterKombatAccount:
         return self.HttpRequest(url, headers, "GET", 200)
 
     def ClaimDailyCipherRequest(self, DailyCipher):
-        url = "https://api.hamsterkombatgame.io/clicker/claim-daily-cipher"
+        url = f"{HamsterApiUrl}/clicker/claim-daily-cipher"
         headers = {
             "Access-Control-Request-Headers": "authorization,content-type",
             "Access-Control-Request-Method": "POST",
@@ -895,7 +1384,7 @@ class HamsterKombatAccount:
         return self.HttpRequest(url, headers, "POST", 200, payload)
 
     def CheckTaskRequest(self, task_id):
-        url = "https://api.hamsterkombatgame.io/clicker/check-task"
+        url = f"{HamsterApiUrl}/clicker/check-task"
         headers = {
             "Access-Control-Request-Headers": "authorization,content-type",
             "Access-Control-Request-Method": "POST",
@@ -933,26 +1422,77 @@ class HamsterKombatAccount:
             return False
 
         log.info(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✔ Card bought successfully")
-        time.sleep(3)
+        self.purchaseIntents.Remove(card["id"])
         self.balanceCoins -= card["price"]
         self.ProfitPerHour += card["profitPerHourDelta"]
         self.SpendTokens += card["price"]
+        self.JournalRound(False)
         self.earnPassivePerHour += card["profitPerHourDelta"]
 
         return True
 
-    def ListBuyOptions(self, selected_upgrades):
+    # Buy the cards whose cooldown has ended, returns the number of bought cards
+    def BuyDueCards(self):
+        if not self.config["auto_upgrade"] or not self.config["wait_for_best_card"]:
+            self.purchaseIntents.Clear()
+            return 0
+
+        bought = 0
+        for card in self.purchaseIntents.PopDue():
+            # The card is kept and bought once the income paid its price
+            if self.balanceCoins < card["price"]:
+                log.warning(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 😪 Cooldown of {w.b}{card['name']}{w.rs} ended but the balance is too low to buy it."
+                )
+                if self.earnPassivePerHour > 0:
+                    self.purchaseIntents.Add(
+                        card,
+                        time.time()
+                        + (card["price"] - self.balanceCoins)
+                        / (self.earnPassivePerHour / 3600),
+                    )
+                continue
+
+            log.info(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ⏰ Cooldown of {w.b}{card['name']}{w.rs} ended, buying it."
+            )
+            card["cooldownSeconds"] = 0
+            if self.BuyCard(card):
+                bought += 1
+                self.SendTelegramLog(
+                    f"[{self.account_name}]: Bought {card['name']} with profit {card['profitPerHourDelta']} and price {number_to_string(card['price'])}, Level: {card['level']}",
+                    "upgrades",
+                )
+        return bought
+
+    # Cards of upgradesForBuy ordered by the card score model of the account, as (card, score) pairs
+    def RankUpgrades(self, upgrades, allUpgrades, max_price=None):
+        table = CardTable(
+            upgrades,
+            self.balanceCoins,
+            self.earnPassivePerHour,
+            all_upgrades=allUpgrades,
+        )
+        model = self.GetConfig("card_score_model", "payback")
+        if model not in CostModels:
+            log.error(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✖ Unknown card_score_model {w.r}{model}{w.rs}, using {w.b}payback{w.rs}."
+            )
+            model = "payback"
+        return table.Rank(model, max_price)
+
+    # rankedUpgrades are (card, score) pairs, the score is None for cards the model did not rank
+    def ListBuyOptions(self, rankedUpgrades):
         log.info(
             f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 📃 List of {w.b}{self.GetConfig('show_num_buy_options', 0)}{w.rs} best buy options:"
         )
         count = 1
-        for selected_card in selected_upgrades:
+        for selected_card, score in rankedUpgrades:
             if (
                 "cooldownSeconds" in selected_card
                 and selected_card["cooldownSeconds"] > 0
             ):
                 continue
-            profitCoefficient = CalculateCardProfitCoefficient(selected_card)
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🃏 {count}: {w.b}{selected_card['name']}{w.rs}"
             )
@@ -962,16 +1502,32 @@ class HamsterKombatAccount:
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Price: {w.y}{number_to_string(selected_card['price'])}"
             )
-            log.info(
-                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ Coefficient: {w.y}{int(profitCoefficient)}{w.rs} Level: {w.b}{selected_card['level']}"
-            )
+            if score is None:
+                log.info(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ Level: {w.b}{selected_card['level']}"
+                )
+            else:
+                log.info(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ Score ({self.GetConfig('card_score_model', 'payback')}): {w.y}{score:.4g}{w.rs} Level: {w.b}{selected_card['level']}"
+                )
             count = count + 1
             if count > self.GetConfig("show_num_buy_options", 0):
                 break
 
+    # Order the upgrades by the multi-step purchase plan instead of the single best coefficient
+    def GetPlannedUpgrades(self, upgradesForBuy):
+        planStart = time.time()
+        selected_upgrades, plan = self.upgradePlanner.SortUpgrades(
+            upgradesForBuy, int(self.balanceCoins), self.earnPassivePerHour
+        )
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🧭 Upgrade plan: {w.b}{len(plan)}{w.rs} purchases, +{w.g}{number_to_string(int(sum(step['profitPerHourDelta'] for step in plan)))}{w.rs} profit per hour in {w.b}{self.upgradePlanner.horizon_hours}{w.rs} hours ({int((time.time() - planStart) * 1000)} ms)."
+        )
+        return selected_upgrades
+
     def BuyBestCard(self):
         log.info(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🃏 Checking for best card.")
-        time.sleep(2)
+        self.Pause(2)
         upgradesResponse = self.UpgradesForBuyRequest()
         if upgradesResponse is None:
             log.error(
@@ -1002,35 +1558,42 @@ class HamsterKombatAccount:
             f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🔼 Searching for the best upgrades."
         )
 
-        selected_upgrades = SortUpgrades(
-            upgrades, 999_999_999_999
-        )  # Set max budget to a high number
+        rankedUpgrades = self.RankUpgrades(upgrades, upgradesResponse["upgradesForBuy"])
+        if self.GetConfig("upgrade_planner", False):
+            selected_upgrades = self.GetPlannedUpgrades(
+                upgradesResponse["upgradesForBuy"]
+            )
+        else:
+            selected_upgrades = [card for card, score in rankedUpgrades]
         if len(selected_upgrades) == 0:
             log.warning(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─  No upgrades available."
             )
             return False
 
+        # The listed options follow the order of the purchases
         if self.GetConfig("show_num_buy_options", 0) > 0:
-            self.ListBuyOptions(selected_upgrades)
+            scores = {card["id"]: score for card, score in rankedUpgrades}
+            self.ListBuyOptions(
+                [(card, scores.get(card["id"])) for card in selected_upgrades]
+            )
 
+        # The intents are made again from the new list
+        self.purchaseIntents.Clear()
         current_selected_card = selected_upgrades[0]
         for selected_card in selected_upgrades:
+            # Cards on cooldown are bought when the cooldown ends, the account is not blocked meanwhile
             if (
                 "cooldownSeconds" in selected_card
                 and selected_card["cooldownSeconds"] > 0
-                and selected_card["cooldownSeconds"] < 180
             ):
-                log.warning(
-                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: {w.b}{w.b}{selected_card['name']}{w.rs}{w.rs} is on cooldown and cooldown is less than 180 seconds."
+                self.purchaseIntents.Add(
+                    selected_card, time.time() + selected_card["cooldownSeconds"] + 2
                 )
-                log.warning(
-                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ⏳ Waiting for {w.b}{selected_card['cooldownSeconds'] + 2}{w.rs} seconds."
+                log.info(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ⏳ {w.b}{selected_card['name']}{w.rs} will be bought in {w.b}{selected_card['cooldownSeconds'] + 2}{w.rs} seconds."
                 )
 
-                time.sleep(selected_card["cooldownSeconds"] + 2)
-                selected_card["cooldownSeconds"] = 0
-
             if (
                 "cooldownSeconds" in selected_card
                 and selected_card["cooldownSeconds"] > 0
@@ -1095,6 +1658,12 @@ class HamsterKombatAccount:
             log.warning(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 😪 Balance is too low to buy the best card."
             )
+            if self.earnPassivePerHour > 0:
+                self.AddWakeHint(
+                    "upgrades",
+                    (current_selected_card["price"] - balanceCoins)
+                    / (self.earnPassivePerHour / 3600),
+                )
 
             self.SendTelegramLog(
                 f"[{self.account_name}]: 😪 Balance is too low to buy the best card, Best card: {current_selected_card['name']} with profit {current_selected_card['profitPerHourDelta']} and price {number_to_string(current_selected_card['price'])}, Level: {current_selected_card['level']}",
@@ -1108,7 +1677,7 @@ class HamsterKombatAccount:
         buy_result = self.BuyCard(current_selected_card)
 
         if buy_result:
-            time.sleep(2)
+            self.Pause(2)
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✅ Best card purchase completed successfully | profit increased +{w.b}{number_to_string(self.ProfitPerHour)} {w.rs}coins | Spend tokens: {w.y}{number_to_string(self.SpendTokens)}"
             )
@@ -1167,10 +1736,11 @@ class HamsterKombatAccount:
                 log.info(
                     f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ⏳ Daily mini game {w.r}{game['id']} is on cooldown."
                 )
+                self.AddWakeHint("minigame", game["remainSecondsToNextAttempt"])
                 continue
 
             ## check timer.
-            url = "https://api.hamsterkombatgame.io/clicker/start-keys-minigame"
+            url = f"{HamsterApiUrl}/clicker/start-keys-minigame"
 
             headers = {
                 "Access-Control-Request-Headers": "authorization",
@@ -1251,7 +1821,7 @@ class HamsterKombatAccount:
             )
             time.sleep(waitTime)
 
-            url = "https://api.hamsterkombatgame.io/clicker/claim-daily-keys-minigame"
+            url = f"{HamsterApiUrl}/clicker/claim-daily-keys-minigame"
 
             headers = {
                 "Access-Control-Request-Headers": "authorization,content-type",
@@ -1344,7 +1914,7 @@ class HamsterKombatAccount:
         )
 
     def GetPromos(self):
-        url = "https://api.hamsterkombatgame.io/clicker/get-promos"
+        url = f"{HamsterApiUrl}/clicker/get-promos"
         headers = {
             "Access-Control-Request-Headers": "authorization",
             "Access-Control-Request-Method": "POST",
@@ -1404,6 +1974,10 @@ class HamsterKombatAccount:
                     f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🤖 {w.y}Detected unknown playground game: {w.r}{promo['title']['en']}. {w.y}Check project github for updates."
                 )
 
+        if self.promoPipeline is not None:
+            self.QueuePlaygroundGameKeys(shuffled_promos, response)
+            return
+
         for promo in shuffled_promos:
             if promo["promoId"] not in SupportedPromoGames:
                 continue
@@ -1422,32 +1996,137 @@ class HamsterKombatAccount:
                 log.info(
                     f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🎮 {w.r}Starting {w.bb}{promoData['name']}{w.r}{w.r} Playground game."
                 )
-                time.sleep(1)
+                self.Pause(1)
                 promoCode = self.GetPlayGroundGameKey(promoData)
-                if promoCode is not None:
-                    log.info(
-                        f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ {w.bb}{promoData['name']}{w.rs} | key: {w.y}{promoCode}"
-                    )
-                    time.sleep(2)
+                if promoCode is not None and not self.ApplyPlayGroundGameKey(
+                    promoData, promoCode
+                ):
+                    return
+
+    def ApplyPlayGroundGameKey(self, promoData, promoCode):
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ {w.bb}{promoData['name']}{w.rs} | key: {w.y}{promoCode}"
+        )
+        self.Pause(2)
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Claiming {w.bb}{promoData['name']}{w.rs}."
+        )
+        claimResponse = self.ClaimPlayGroundGame(promoCode)
+        if claimResponse is None:
+            log.error(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to claim {w.bb}{promoData['name']}{w.rs} key."
+            )
+            return False
+
+        self.JournalForget("promocode", promoCode)
+
+        rewardType = claimResponse.get("reward").get("type")
+        rewardAmount = claimResponse.get("reward").get("amount")
+
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ {w.bb}{promoData['name']}{w.rs} claimed successfully. Aquired {w.y}{number_to_string(rewardAmount)} {rewardType}."
+        )
+        return True
+
+    # Claim the keys generated in the background and queue the missing ones
+    def QueuePlaygroundGameKeys(self, promos, promosResponse):
+        if self.promoStore is not None:
+            return self.ClaimStoredPlaygroundGameKeys(promos, promosResponse)
+
+        readyCodes = self.promoPipeline.TakeCodes(self)
+        for promoId, promoCode in readyCodes:
+            self.ApplyPlayGroundGameKey(SupportedPromoGames[promoId], promoCode)
+
+        if readyCodes:
+            # Refresh the promo states after claiming the keys
+            response = self.GetPromos()
+            if response is not None and "promos" in response:
+                promosResponse = response
+
+        maxInFlight = self.GetConfig("max_promo_games_per_round", 3)
+        for promo in promos:
+            if promo["promoId"] not in SupportedPromoGames:
+                continue
+            if not self.CheckPlayGroundGameState(promo, promosResponse):
+                continue
+
+            promoData = SupportedPromoGames[promo["promoId"]]
+            missingKeys = self.GetRemainingPlayGroundGameKeys(
+                promo, promosResponse
+            ) - self.promoPipeline.PendingCount(self, promo["promoId"])
+
+            for i in range(missingKeys):
+                if (
+                    maxInFlight != 0
+                    and self.promoPipeline.PendingCount(self) >= maxInFlight
+                ):
                     log.info(
-                        f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Claiming {w.bb}{promoData['name']}{w.rs}."
+                        f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Maximum number of playground games in progress. We will queue other games in the next run."
                     )
-                    claimResponse = self.ClaimPlayGroundGame(promoCode)
-                    if claimResponse is None:
-                        log.error(
-                            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to claim {w.bb}{promoData['name']}{w.rs} key."
-                        )
-                        return
+                    return
+
+                log.info(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🎮 {w.r}Queued {w.bb}{promoData['name']}{w.r}{w.r} Playground game."
+                )
+                self.promoPipeline.Submit(self, promoData)
+
+    # Claim keys from the shared code stock and queue the generation of the missing ones
+    def ClaimStoredPlaygroundGameKeys(self, promos, promosResponse):
+        maxInFlight = self.GetConfig("max_promo_games_per_round", 3)
+        for promo in promos:
+            if promo["promoId"] not in SupportedPromoGames:
+                continue
+            if not self.CheckPlayGroundGameState(promo, promosResponse):
+                continue
+
+            promoData = SupportedPromoGames[promo["promoId"]]
+            missingKeys = self.GetRemainingPlayGroundGameKeys(promo, promosResponse)
+            while missingKeys > 0:
+                promoCode = self.promoStore.Take(promo["promoId"], self.account_name)
+                if promoCode is None:
+                    break
 
-                    rewardType = claimResponse.get("reward").get("type")
-                    rewardAmount = claimResponse.get("reward").get("amount")
+                # The code goes back to the stock when the claim failed
+                if not self.ApplyPlayGroundGameKey(promoData, promoCode):
+                    self.promoStore.Release(promoCode)
+                    break
+
+                self.promoStore.Consume(promoCode)
+                missingKeys -= 1
+
+            # Keep the stock filled for the other accounts and the next rounds
+            missingCodes = (
+                missingKeys
+                + PromoCodeStock
+                - self.promoStore.Available(promo["promoId"])
+                - self.promoPipeline.PendingCount(promoId=promo["promoId"])
+            )
 
+            for i in range(missingCodes):
+                if (
+                    maxInFlight != 0
+                    and self.promoPipeline.PendingCount(self) >= maxInFlight
+                ):
                     log.info(
-                        f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ {w.bb}{promoData['name']}{w.rs} claimed successfully. Aquired {w.y}{number_to_string(rewardAmount)} {rewardType}."
+                        f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Maximum number of playground games in progress. We will queue other games in the next run."
                     )
+                    return
+
+                log.info(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🎮 {w.r}Queued {w.bb}{promoData['name']}{w.r}{w.r} Playground game."
+                )
+                self.promoPipeline.Submit(self, promoData)
+
+    def GetRemainingPlayGroundGameKeys(self, promo, promos):
+        receivedKeys = 0
+        for state in promos.get("states", []):
+            if state["promoId"] == promo["promoId"]:
+                receivedKeys = state["receiveKeysToday"]
+
+        return max(promo["keysPerDay"] - receivedKeys, 0)
 
     def ClaimPlayGroundGame(self, promoCode):
-        url = "https://api.hamsterkombatgame.io/clicker/apply-promo"
+        url = f"{HamsterApiUrl}/clicker/apply-promo"
 
         headers = {
             "Access-Control-Request-Headers": "authorization,content-type",
@@ -1473,46 +2152,9 @@ class HamsterKombatAccount:
         return self.HttpRequest(url, headers, "POST", 200, payload)
 
     def GetPlayGroundGameKey(self, promoData):
-        appToken = promoData["appToken"]
-        clientId = f"{int(time.time() * 1000)}-{''.join(str(random.randint(0, 9)) for _ in range(19))}"
-        if "clientIdType" in promoData:
-            if promoData["clientIdType"] == "16str":
-                clientId = "".join(
-                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=16)
-                )
-            elif promoData["clientIdType"] == "32str":
-                clientId = "".join(
-                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=32)
-                )
-            elif promoData["clientIdType"] == "5+32str":
-                p1 = "".join(
-                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=5)
-                )
-                p2 = "".join(
-                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=32)
-                )
-                clientId = f"{p1}_{p2}"
-            elif promoData["clientIdType"] == "7digStr":
-                clientId = "".join(random.choices("0123456789", k=7))
-            elif promoData["clientIdType"] == "16UpStr":
-                clientId = "".join(
-                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=16)
-                ).upper()
-            elif promoData["clientIdType"] == "ts+19dig":
-                ts = str(int(datetime.datetime.now().timestamp() * 1000))
-                nums = "".join(random.choices("0123456789", k=19))
-                clientId = f"{ts}-{nums}"
-            elif promoData["clientIdType"] == "uuid":
-                clientId = str(uuid.uuid4())
-
         log.info(
             f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Getting {w.bb}{promoData['name']}{w.rs} key."
         )
-        url = "https://api.gamepromo.io/promo/login-client"
-
-        if promoData.get("useNewApi"):
-            url = "https://api.gamepromo.io/promo/1/login-client"
-
         headers_option = {
             "Host": "api.gamepromo.io",
             "Origin": "",
@@ -1541,85 +2183,66 @@ class HamsterKombatAccount:
             headers_post["X-Unity-Version"] = promoData["x-unity-version"]
             headers_option["X-Unity-Version"] = promoData["x-unity-version"]
 
-        self.HttpRequest(url, headers_option, "OPTIONS", 204, True)
-
-        payloadData = {
-            "appToken": appToken,
-            "clientId": clientId,
-            "clientOrigin": promoData["clientOrigin"],
-        }
-
-        if "clientVersion" in promoData and promoData["clientVersion"] != None:
-            payloadData["clientVersion"] = promoData["clientVersion"]
-
-        payload = json.dumps(payloadData)
-
-        response = self.HttpRequest(url, headers_post, "POST", 200, payload)
-        if response is None:
-            log.error(
-                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to get {w.bb}{promoData['name']}{w.rs} key."
-            )
-            self.SendTelegramLog(
-                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to get {promoData['name']} key.",
-                "other_errors",
+        # Continue the key generation of the previous run
+        promoOrphan = self.TakePromoOrphan("promocode", promoData["promoId"])
+        if promoOrphan is not None:
+            log.info(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Using the {w.bb}{promoData['name']}{w.rs} key generated before the restart."
             )
-            return None
+            return promoOrphan[0]
 
-        if "clientToken" not in response:
-            log.error(
-                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to get {w.bb}{promoData['name']}{w.rs}key."
+        retryCount = 0
+        promoOrphan = self.TakePromoOrphan("promo", promoData["promoId"])
+        if promoOrphan is not None:
+            sessionId, session = promoOrphan
+            clientToken = session["clientToken"]
+            retryCount = session.get("attempts", 0)
+            log.info(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Continuing the {w.bb}{promoData['name']}{w.rs} key started before."
             )
-            self.SendTelegramLog(
-                f"[{self.account_name}]: Unable to get {promoData['name']} key.",
-                "other_errors",
+        else:
+            clientToken = self.LoginPlayGroundGame(
+                promoData, headers_option, headers_post
             )
-            return None
-
-        clientToken = response["clientToken"]
-
-        if promoData.get("useNewApi"):
-            url = "https://api.gamepromo.io/promo/1/get-client"
-            headers_post["Authorization"] = f"Bearer {clientToken}"
+            if clientToken is None:
+                return None
 
-            payloadData = {
+            sessionId = str(uuid.uuid4())
+            session = {
                 "promoId": promoData["promoId"],
+                "clientToken": clientToken,
+                "attempts": 0,
+                "createdAt": int(time.time()),
             }
-
-            payload = json.dumps(payloadData)
-
-            response = self.HttpRequest(url, headers_post, "POST", 200, payload)
-            if response is None:
-                log.error(
-                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to get {w.bb}{promoData['name']}{w.rs} key."
-                )
-                self.SendTelegramLog(
-                    f"[{self.account_name}]: Unable to get {promoData['name']} key.",
-                    "other_errors",
-                )
-                return None
-
-        TimeSleep = promoData["delay"] + random.randint(1, 5)
-        log.info(
-            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Waiting for {TimeSleep} seconds."
-        )
-        time.sleep(TimeSleep)
+            self.JournalRecord("promo", sessionId, session)
 
         log.info(
             f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Registering event for {w.bb}{promoData['name']}{w.rs} (This may take a while ~5-20 minutes)."
         )
 
-        url = "https://api.gamepromo.io/promo/register-event"
+        url = f"{GamePromoApiUrl}/promo/register-event"
 
         if promoData.get("useNewApi"):
-            url = "https://api.gamepromo.io/promo/1/register-event"
+            url = f"{GamePromoApiUrl}/promo/1/register-event"
 
         headers_post["Authorization"] = f"Bearer {clientToken}"
 
         response = None
 
-        retryCount = 0
         while retryCount < 20:
+            # Requests are skipped after the round deadline, the session is continued next round
+            if self.RoundDeadlinePassed():
+                self.JournalPause("promo", sessionId, session)
+                log.warning(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Round deadline reached, {w.bb}{promoData['name']}{w.rs} key is continued in the next round."
+                )
+                return None
+
             retryCount += 1
+            session["attempts"] = retryCount
+            self.JournalRecord("promo", sessionId, session)
+            if retryCount > 1:
+                metrics.ObserveRetry(url, "POST", self.account_name, self.Proxy)
             eventID = str(uuid.uuid4())
 
             if "eventIdType" in promoData:
@@ -1657,6 +2280,11 @@ class HamsterKombatAccount:
             response = self.HttpRequest(url, headers_post, "POST", 200, payload, True)
 
             if response is None or not isinstance(response, dict):
+                if self.RoundDeadlinePassed():
+                    # The request was skipped, it is not an attempt
+                    retryCount -= 1
+                    session["attempts"] = retryCount
+                    continue
                 timeout = promoData["retry_delay"] + random.randint(1, 5)
                 log.warning(
                     f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Event registration for {w.bb}{promoData['name']}{w.rs} failed, retry in {timeout} seconds."
@@ -1674,6 +2302,8 @@ class HamsterKombatAccount:
 
             break
 
+        self.JournalForget("promo", sessionId)
+
         if (
             response is None
             or not isinstance(response, dict)
@@ -1701,9 +2331,9 @@ class HamsterKombatAccount:
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Event registered successfully."
             )
 
-        url = "https://api.gamepromo.io/promo/create-code"
+        url = f"{GamePromoApiUrl}/promo/create-code"
         if promoData.get("useNewApi"):
-            url = "https://api.gamepromo.io/promo/1/create-code"
+            url = f"{GamePromoApiUrl}/promo/1/create-code"
 
         headers_option["access-control-request-headers"] = "authorization,content-type"
 
@@ -1741,8 +2371,118 @@ class HamsterKombatAccount:
             return None
 
         promoCode = response["promoCode"]
+        # Kept until the key is claimed or stored
+        self.JournalRecord(
+            "promocode",
+            promoCode,
+            {"promoId": promoData["promoId"], "createdAt": int(time.time())},
+        )
         return promoCode
 
+    # Log in to the game promo API, returns the client token
+    def LoginPlayGroundGame(self, promoData, headers_option, headers_post):
+        appToken = promoData["appToken"]
+        clientId = f"{int(time.time() * 1000)}-{''.join(str(random.randint(0, 9)) for _ in range(19))}"
+        if "clientIdType" in promoData:
+            if promoData["clientIdType"] == "16str":
+                clientId = "".join(
+                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=16)
+                )
+            elif promoData["clientIdType"] == "32str":
+                clientId = "".join(
+                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=32)
+                )
+            elif promoData["clientIdType"] == "5+32str":
+                p1 = "".join(
+                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=5)
+                )
+                p2 = "".join(
+                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=32)
+                )
+                clientId = f"{p1}_{p2}"
+            elif promoData["clientIdType"] == "7digStr":
+                clientId = "".join(random.choices("0123456789", k=7))
+            elif promoData["clientIdType"] == "16UpStr":
+                clientId = "".join(
+                    random.choices("abcdefghijklmnopqrstuvwxyz0123456789", k=16)
+                ).upper()
+            elif promoData["clientIdType"] == "ts+19dig":
+                ts = str(int(datetime.datetime.now().timestamp() * 1000))
+                nums = "".join(random.choices("0123456789", k=19))
+                clientId = f"{ts}-{nums}"
+            elif promoData["clientIdType"] == "uuid":
+                clientId = str(uuid.uuid4())
+
+        url = f"{GamePromoApiUrl}/promo/login-client"
+
+        if promoData.get("useNewApi"):
+            url = f"{GamePromoApiUrl}/promo/1/login-client"
+
+        self.HttpRequest(url, headers_option, "OPTIONS", 204, True)
+
+        payloadData = {
+            "appToken": appToken,
+            "clientId": clientId,
+            "clientOrigin": promoData["clientOrigin"],
+        }
+
+        if "clientVersion" in promoData and promoData["clientVersion"] != None:
+            payloadData["clientVersion"] = promoData["clientVersion"]
+
+        payload = json.dumps(payloadData)
+
+        response = self.HttpRequest(url, headers_post, "POST", 200, payload)
+        if response is None:
+            log.error(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to get {w.bb}{promoData['name']}{w.rs} key."
+            )
+            self.SendTelegramLog(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to get {promoData['name']} key.",
+                "other_errors",
+            )
+            return None
+
+        if "clientToken" not in response:
+            log.error(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to get {w.bb}{promoData['name']}{w.rs}key."
+            )
+            self.SendTelegramLog(
+                f"[{self.account_name}]: Unable to get {promoData['name']} key.",
+                "other_errors",
+            )
+            return None
+
+        clientToken = response["clientToken"]
+
+        if promoData.get("useNewApi"):
+            url = f"{GamePromoApiUrl}/promo/1/get-client"
+            headers_post["Authorization"] = f"Bearer {clientToken}"
+
+            payloadData = {
+                "promoId": promoData["promoId"],
+            }
+
+            payload = json.dumps(payloadData)
+
+            response = self.HttpRequest(url, headers_post, "POST", 200, payload)
+            if response is None:
+                log.error(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: Unable to get {w.bb}{promoData['name']}{w.rs} key."
+                )
+                self.SendTelegramLog(
+                    f"[{self.account_name}]: Unable to get {promoData['name']} key.",
+                    "other_errors",
+                )
+                return None
+
+        TimeSleep = promoData["delay"] + random.randint(1, 5)
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ├─ Waiting for {TimeSleep} seconds."
+        )
+        time.sleep(TimeSleep)
+
+        return clientToken
+
     def CheckPlayGroundGameState(self, promo, promos):
         if not self.config["auto_playground_games"]:
             log.info(
@@ -1768,8 +2508,44 @@ class HamsterKombatAccount:
     def Start(self):
         log.info(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🌌 Starting account.")
 
+        # The first reads do not depend on each other and are sent at the same time,
+        # only the versioned config waits for the config version of the sync response.
+        bootstrapCalls = {
+            "ip": (self.IPRequest, []),
+            "accountInfo": (self.AccountInfoTelegramRequest, []),
+            "accountData": (self.getAccountData, []),
+            "configVersion": (
+                lambda: (
+                    self.GetAccountConfigVersionRequest()
+                    if self.configVersion != ""
+                    else None
+                ),
+                ["accountData"],
+            ),
+            "config": (self.GetAccountConfigRequest, []),
+            "upgrades": (self.UpgradesForBuyRequest, []),
+            "tasks": (self.ListTasksRequest, []),
+            "airdropTasks": (self.GetListAirDropTasksRequest, []),
+            "skins": (self.GetSkins, []),
+        }
+
+        # Nothing can have changed since the last answer of these endpoints
+        knownCalls = [
+            name
+            for name in ["config", "tasks", "airdropTasks", "skins"]
+            if self.IsStateKnown(name)
+        ]
+        for name in knownCalls:
+            del bootstrapCalls[name]
+        if knownCalls:
+            log.info(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🧠 Skipping known state: {w.b}{', '.join(knownCalls)}{w.rs}."
+            )
+
+        bootstrap = RunTaskGraph(bootstrapExecutor, bootstrapCalls)
+
         log.info(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 📡 Getting account IP.")
-        ipResponse = self.IPRequest()
+        ipResponse = bootstrap["ip"]
         if ipResponse is None:
             log.error(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✖ {w.r}Failed to get IP."
@@ -1793,7 +2569,7 @@ class HamsterKombatAccount:
         log.info(
             f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🛸 Getting basic account data."
         )
-        AccountBasicData = self.AccountInfoTelegramRequest()
+        AccountBasicData = bootstrap["accountInfo"]
 
         if (
             AccountBasicData is None
@@ -1822,7 +2598,7 @@ class HamsterKombatAccount:
         )
 
         log.info(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🛸 Getting account data.")
-        getAccountDataStatus = self.getAccountData()
+        getAccountDataStatus = bootstrap["accountData"]
         if getAccountDataStatus is False:
             return
 
@@ -1841,14 +2617,16 @@ class HamsterKombatAccount:
         )
         AccountConfigVersionData = None
         if self.configVersion != "":
-            AccountConfigVersionData = self.GetAccountConfigVersionRequest()
-            if AccountConfigVersionData.get("config", {}):
-                self.configData = AccountConfigVersionData.get("config", {})
+            AccountConfigVersionData = bootstrap["configVersion"]
+            if AccountConfigVersionData and AccountConfigVersionData.get("config", {}):
+                self.configIndex = configVersionCache.GetIndex(
+                    self.configVersion, AccountConfigVersionData.get("config", {})
+                )
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ Account config version: {w.b}{self.configVersion}"
             )
 
-        AccountConfigData = self.GetAccountConfigRequest()
+        AccountConfigData = bootstrap.get("config", {})
         if AccountConfigData is None or AccountConfigData is False:
             log.error(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✖ Unable to get account config data."
@@ -1862,7 +2640,7 @@ class HamsterKombatAccount:
         log.info(
             f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🔧 Getting account upgrades."
         )
-        upgradesResponse = self.UpgradesForBuyRequest()
+        upgradesResponse = bootstrap["upgrades"]
 
         if upgradesResponse is None:
             log.error(
@@ -1875,7 +2653,7 @@ class HamsterKombatAccount:
             return
 
         log.info(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🎯 Getting account tasks.")
-        tasksResponse = self.ListTasksRequest()
+        tasksResponse = bootstrap.get("tasks", {})
 
         if tasksResponse is None:
             log.error(
@@ -1885,20 +2663,33 @@ class HamsterKombatAccount:
                 f"[{self.account_name}]: ✖ Failed to get tasks list.",
                 "other_errors",
             )
+        elif isinstance(tasksResponse.get("tasks"), list) and self.TasksDone(
+            tasksResponse["tasks"]
+        ):
+            streakRemain = None
+            for task in tasksResponse["tasks"]:
+                if task["id"] == "streak_days_special":
+                    streakRemain = task.get("remainSeconds")
+            self.RememberState("tasks", True, streakRemain)
 
         log.info(
             f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🪂 Getting account airdrop tasks."
         )
-        airdropTasksResponse = self.GetListAirDropTasksRequest()
+        airdropTasksResponse = bootstrap.get("airdropTasks", {})
 
-        if airdropTasksResponse is None:
+        # The airdrop tasks and skins are not used by the bot yet
+        if airdropTasksResponse is not None:
+            self.RememberState("airdropTasks", False)
+        else:
             log.error(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✖ Failed to get airdrop tasks list."
             )
 
         log.info(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 👕 Getting account skins.")
-        SkinsData = self.GetSkins()
-        if SkinsData is None:
+        SkinsData = bootstrap.get("skins", {})
+        if SkinsData is not None:
+            self.RememberState("skins", False)
+        else:
             log.error(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✖ Failed to get skins.")
             self.SendTelegramLog(
                 f"[{self.account_name}]: ✖ Failed to get skins.",
@@ -1930,37 +2721,9 @@ class HamsterKombatAccount:
         #     self.StartMiniGame(AccountConfigData, AccountBasicData["accountInfo"]["id"])
 
         # Start tapping
+        tapped = False
         if self.config["auto_tap"]:
-            log.info(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 👇 Starting to tap.")
-
-            # add loading animastion
-            def loading_bar(duration):
-
-                bar_length = 40
-                end_time = time.time() + duration
-                while time.time() < end_time:
-                    for i in range(bar_length + 1):
-                        percent = (i / bar_length) * 100
-                        bar = "█" * i + "-" * (bar_length - i)
-                        sys.stdout.write(f"\r[{bar}] {percent:.2f}%")
-                        sys.stdout.flush()
-                        time.sleep(
-                            duration / bar_length
-                        )  # Adjust the duration for each step
-
-                # Clear the loading bar
-                sys.stdout.write(
-                    "\r" + " " * (bar_length + 8) + "\r"
-                )  # Clear the bar and percentage
-                sys.stdout.flush()
-
-            loading_bar(4)  # ihope is work properly
-            # time.sleep(3)
-
-            self.TapRequest(self.availableTaps)
-            log.info(
-                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 👍 Tapping completed successfully."
-            )
+            tapped = self.StartTapping()
 
         if self.config["auto_get_daily_cipher"] and DailyCipher != "":
             if AccountConfigData["dailyCipher"]["isClaimed"] == True:
@@ -1971,7 +2734,7 @@ class HamsterKombatAccount:
                 log.info(
                     f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✍ Attempting to claim daily cipher."
                 )
-                time.sleep(2)
+                self.Pause(2)
                 self.ClaimDailyCipherRequest(DailyCipher)
                 log.info(
                     f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─  Daily cipher claimed successfully."
@@ -1981,6 +2744,15 @@ class HamsterKombatAccount:
                     "daily_cipher",
                 )
 
+        # The config is only used for the daily cipher
+        if "dailyCipher" in AccountConfigData and (
+            AccountConfigData["dailyCipher"].get("isClaimed", False)
+            or not self.config["auto_get_daily_cipher"]
+        ):
+            self.RememberState(
+                "config", True, AccountConfigData["dailyCipher"].get("remainSeconds")
+            )
+
         if (
             self.config["auto_get_daily_task"]
             and tasksResponse is not None
@@ -2015,7 +2787,7 @@ class HamsterKombatAccount:
                 reward = self.GetTaskReward(streak_days)
                 reward = f"{w.g}{reward}" if "Unable" not in reward else f"{w.y}{reward}"
 
-                time.sleep(2)
+                self.Pause(2)
                 self.CheckTaskRequest(streak_days["id"])
                 log.info(
                     f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─  Daily task completed successfully, Week: {w.g}{week}{w.rs}, Day: {w.g}{day}{w.rs}, Reward: {reward}."
@@ -2037,9 +2809,17 @@ class HamsterKombatAccount:
             selected_task = None
             for task in tasksResponse["tasks"]:
                 TaskType = task.get("type", "")
-                if task["isCompleted"] == False and (
-                    task["id"]
-                    not in ["select_exchange", "invite_friends", "streak_days_special"]
+                if (
+                    task["isCompleted"] == False
+                    and (
+                        task["id"]
+                        not in [
+                            "select_exchange",
+                            "invite_friends",
+                            "streak_days_special",
+                        ]
+                    )
+                    and not self.TaskCheckedRecently(task["id"])
                 ):
                     log.info(
                         f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✍ Attempting to complete Youtube Or Twitter task."
@@ -2047,8 +2827,11 @@ class HamsterKombatAccount:
                     selected_task = task["id"]
                     reward = self.GetTaskReward(task)
                     reward = f"{w.g}{reward}" if "Unable" not in reward else f"{w.y}{reward}"
-                    time.sleep(2)
+                    self.Pause(2)
                     self.CheckTaskRequest(selected_task)
+                    self.JournalRecord(
+                        "task", selected_task, {"checkedAt": int(time.time())}
+                    )
                     log.info(
                         f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─  Task completed - id: {w.r}{selected_task}{w.rs}, Reward: {reward}"
                     )
@@ -2062,7 +2845,13 @@ class HamsterKombatAccount:
                 )
 
         try:
-            if self.GetConfig("auto_daily_combo_enable", False):
+            if self.GetConfig("auto_daily_combo_enable", False) and self.IsStateKnown(
+                "combo"
+            ):
+                log.info(
+                    f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🎁 Daily combo already claimed."
+                )
+            elif self.GetConfig("auto_daily_combo_enable", False):
                 self.ClaimDailyCombo()
             else:
                 log.info(
@@ -2073,24 +2862,25 @@ class HamsterKombatAccount:
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}:{w.r} Something went wrong while claming daily combo."
             )
 
-        # Start buying free tap boost
+        # Start buying free tap boost, only when the energy is nearly empty
         if (
             self.config["auto_tap"]
             and self.config["auto_free_tap_boost"]
+            and tapPlanner.ShouldBoost(self.PredictTaps(), self.maxTaps)
             and self.BuyFreeTapBoostIfAvailable()
         ):
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🚀 Starting to tap with free boost."
             )
-            time.sleep(2)
-            self.TapRequest(self.availableTaps)
+            self.Pause(2)
+            self.SendTaps(self.PredictTaps())
+            tapped = True
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✅ Tapping with free boost completed successfully."
             )
 
-        # Start Syncing account data after tapping
-        if self.config["auto_tap"]:
-            self.getAccountData()
+        # The tap responses have the account data after tapping
+        if self.config["auto_tap"] and tapped:
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 💲 Account Balance Coins: {w.y}{number_to_string(self.balanceCoins)}"
             )
@@ -2101,18 +2891,85 @@ class HamsterKombatAccount:
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: └─ Total Keys: {w.r}{self.totalKeys}{w.rs} | Balance Keys: {w.r}{self.balanceKeys}"
             )
 
+        # Cards whose cooldown ended during the round are bought between the phases
+        self.BuyDueCards()
         self.StartPlaygroundGame()
 
         # Start buying upgrades
+        self.BuyDueCards()
+        self.StartUpgrades()
+
+    # Run only the work the scheduler woke the account up for
+    def StartDueWork(self, reasons):
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ⏰ Woke up for {w.b}{', '.join(reasons)}{w.rs}."
+        )
+        if self.getAccountData() is False:
+            return
+
+        if "taps" in reasons and self.config["auto_tap"] and self.StartTapping():
+            log.info(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 💲 Account Balance Coins: {w.y}{number_to_string(self.balanceCoins)}"
+            )
+
+        # The intents are lost on a restart, the upgrades are checked again instead
+        if "purchases" in reasons and (
+            len(self.purchaseIntents) == 0 or self.BuyDueCards() > 0
+        ):
+            reasons = reasons + ["upgrades"]
+
+        if "upgrades" in reasons:
+            self.StartUpgrades()
+
+    # Returns True when taps were sent
+    def StartTapping(self):
+        energy = self.PredictTaps()
+        if not tapPlanner.ShouldTap(energy, self.maxTaps, self.tapsRecoverPerSec):
+            log.info(
+                f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🔋 Energy {w.g}{int(energy)}/{self.maxTaps}{w.rs}, tapping when it is nearly full."
+            )
+            return False
+
+        log.info(f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 👇 Starting to tap.")
+
+        # add loading animastion
+        def loading_bar(duration):
+
+            bar_length = 40
+            for i in range(bar_length + 1):
+                percent = (i / bar_length) * 100
+                bar = "█" * i + "-" * (bar_length - i)
+                sys.stdout.write(f"\r[{bar}] {percent:.2f}%")
+                sys.stdout.flush()
+                if i < bar_length:
+                    time.sleep(
+                        duration / bar_length
+                    )  # Adjust the duration for each step
+
+            # Clear the loading bar
+            sys.stdout.write(
+                "\r" + " " * (bar_length + 8) + "\r"
+            )  # Clear the bar and percentage
+            sys.stdout.flush()
+
+        if HeadlessMode:
+            self.Pause(4)
+        else:
+            loading_bar(4)
+
+        self.SendTaps(self.PredictTaps())
+        log.info(
+            f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 👍 Tapping completed successfully."
+        )
+        return True
+
+    def StartUpgrades(self):
         if not self.config["auto_upgrade"]:
             log.error(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🔨 Auto upgrade is disabled."
             )
             return
 
-        self.ProfitPerHour = 0
-        self.SpendTokens = 0
-
         if self.config["wait_for_best_card"]:
             while True:
                 if not self.BuyBestCard():
@@ -2144,7 +3001,7 @@ class HamsterKombatAccount:
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🔧 Checking for upgrades."
             )
-            time.sleep(2)
+            self.Pause(2)
             upgradesResponse = self.UpgradesForBuyRequest()
             if upgradesResponse is None:
                 log.warning(
@@ -2176,7 +3033,12 @@ class HamsterKombatAccount:
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 🔎 Searching for the best upgrades."
             )
 
-            selected_upgrades = SortUpgrades(upgrades, balanceCoins)
+            selected_upgrades = [
+                card
+                for card, score in self.RankUpgrades(
+                    upgrades, upgradesResponse["upgradesForBuy"], balanceCoins
+                )
+            ]
             if len(selected_upgrades) == 0:
                 log.warning(
                     f"{w.rs}{w.g}[{self.account_name}]{w.rs}: 😴 No upgrades available."
@@ -2208,7 +3070,7 @@ class HamsterKombatAccount:
             log.info(
                 f"{w.rs}{w.g}[{self.account_name}]{w.rs}: ✍ Attempting to buy an upgrade."
             )
-            time.sleep(2)
+            self.Pause(2)
             upgradesResponse = self.BuyUpgradeRequest(current_selected_card["id"])
             if upgradesResponse is None:
                 log.error(
@@ -2223,10 +3085,11 @@ class HamsterKombatAccount:
                 f"[{self.account_name}]: Bought {current_selected_card['name']} with profit {current_selected_card['profitPerHourDelta']} and price {number_to_string(current_selected_card['price'])}, Level: {current_selected_card['level']}",
                 "upgrades",
             )
-            time.sleep(5)
+            self.Pause(5)
             self.balanceCoins = balanceCoins
             self.ProfitPerHour += current_selected_card["profitPerHourDelta"]
             self.SpendTokens += current_selected_card["price"]
+            self.JournalRound(False)
             self.earnPassivePerHour += current_selected_card["profitPerHourDelta"]
 
         log.info(
@@ -2249,38 +3112,241 @@ class HamsterKombatAccount:
         )
 
 
-def RunAccounts():
-    accounts = []
-    for account in AccountList:
-        accounts.append(HamsterKombatAccount(account))
-        accounts[-1].SendTelegramLog(
-            f"[{accounts[-1].account_name}] Hamster Kombat Auto farming bot started successfully.",
-            "general_info",
+def RunAccountRound(account, reasons=None):
+    account.StartRound()
+    try:
+        # The mini game is only played in the full round
+        # A round stopped by the circuit breaker is run again completely
+        if (
+            reasons is None
+            or "full" in reasons
+            or "minigame" in reasons
+            or "breaker" in reasons
+        ):
+            account.Start()
+        else:
+            account.StartDueWork(reasons)
+    except Exception as e:
+        log.error(
+            f"{w.rs}{w.g}[{account.account_name}]{w.rs}: ✖ Unexpected error: {w.r}{e}"
+        )
+        account.SendTelegramLog(
+            f"[{account.account_name}]: ✖ Unexpected error: {e}",
+            "other_errors",
+        )
+    account.LogRoundSummary()
+    account.EndRound()
+
+    if metricsExport.get("json_file", "") != "":
+        try:
+            metrics.DumpJson(metricsExport["json_file"])
+        except Exception as e:
+            log.error(f"✖ Unable to write the metrics file: {w.r}{e}")
+
+
+# The supervisor combines the metrics of all shards, a shard sends what changed since its last send
+def SendShardMetrics(force=False):
+    global shardMetricsSentAt
+    if shardMetricsQueue is None:
+        return
+    if not force and time.time() - shardMetricsSentAt < ShardMetricsInterval:
+        return
+
+    shardMetricsSentAt = time.time()
+    delta = metrics.TakeSnapshot()
+    if delta:
+        shardMetricsQueue.put((ShardIndex, delta))
+
+
+async def RunAccount(account, reasons, semaphore, scheduler):
+    async with semaphore:
+        await asyncio.to_thread(RunAccountRound, account, reasons)
+
+    # The account was removed from the config while it was running
+    if account.removed:
+        account.httpSession.Close()
+        return
+
+    if AccountsRecheckTime < 1 and MaxRandomDelay < 1:
+        return
+
+    if "full" in reasons or "minigame" in reasons or "breaker" in reasons:
+        account.nextFullPass = time.time() + max(AccountsRecheckTime, 0)
+        if MaxRandomDelay > 0:
+            account.nextFullPass += random.randint(1, MaxRandomDelay)
+
+    # Accounts of a busy proxy are woken up later
+    dueTime, dueReasons = scheduler.ScheduleNext(
+        account,
+        account.wakeHints,
+        account.nextFullPass,
+        rateLimiter.QueueDelay(account.Proxy),
+        {"purchases": account.purchaseIntents.NextDueTime()},
+    )
+    account.JournalRound(True, dueTime, dueReasons)
+    log.info(
+        f"{w.rs}{w.g}[{account.account_name}]{w.rs}: 💤 Next check in {w.b}{int(max(dueTime - time.time(), 0))}{w.rs} seconds for {w.b}{', '.join(dueReasons)}{w.rs}."
+    )
+
+
+# Accounts of this process, all of them unless --shards is used
+def ShardAccounts(accountList):
+    if ShardCount <= 1:
+        return list(accountList)
+    return AssignShards(accountList, ShardCount)[ShardIndex]
+
+
+def AddAccount(accounts, accountSettings, promoPipeline, promoStore):
+    account = HamsterKombatAccount(accountSettings)
+    account.promoPipeline = promoPipeline
+    account.promoStore = promoStore
+    accounts[account.account_name] = account
+    account.SendTelegramLog(
+        f"[{account.account_name}] Hamster Kombat Auto farming bot started successfully.",
+        "general_info",
+    )
+    return account
+
+
+# Apply a reloaded config without restarting, running accounts and promo key work are kept
+def ReloadConfig(newSettings, accounts, scheduler, promoPipeline, promoStore):
+    oldValues = settings.Globals()
+    newValues = newSettings.Globals()
+    for key in RestartRequiredSettings:
+        if oldValues[key] != newValues[key]:
+            log.warning(
+                f"⚠ {w.y}{key}{w.rs} was changed, restart the bot to use the new value."
+            )
+        newValues[key] = globals()[key]
+    globals().update(newValues)
+    globals()["settings"] = newSettings
+    # The scheduler was built with the old value
+    scheduler.min_delay = SchedulerMinDelay
+
+    newAccounts = {
+        accountSettings.account_name: accountSettings
+        for accountSettings in ShardAccounts(newSettings.accounts)
+    }
+    for name in list(accounts):
+        if name not in newAccounts:
+            account = accounts.pop(name)
+            account.removed = True
+            scheduler.Remove(account)
+            log.info(f"{w.rs}{w.g}[{name}]{w.rs}: ➖ Account removed from the config.")
+
+    for name, accountSettings in newAccounts.items():
+        if name not in accounts:
+            AddAccount(accounts, accountSettings, promoPipeline, promoStore)
+            scheduler.Schedule(
+                accounts[name], *accounts[name].ResumeSchedule(time.time())
+            )
+            log.info(f"{w.rs}{w.g}[{name}]{w.rs}: ➕ Account added from the config.")
+        elif (
+            accountSettings.Key()
+            != (accounts[name].pendingSettings or accounts[name].settings).Key()
+        ):
+            accounts[name].ApplySettings(accountSettings)
+            log.info(f"{w.rs}{w.g}[{name}]{w.rs}: 🔄 Account settings updated.")
+
+
+async def RunAccounts():
+    # Playground game keys are generated in the background and claimed on the next pass
+    promoPipeline = None
+    promoStore = None
+    if PromoKeyWorkers > 0:
+        if PromoCodeStoreFile != "":
+            promoStore = PromoCodeStore(PromoCodeStoreFile)
+
+        promoPipeline = PromoKeyPipeline(PromoKeyWorkers, promoStore)
+        promoPipeline.Start()
+
+    accounts = {}
+    for accountSettings in ShardAccounts(AccountList):
+        AddAccount(accounts, accountSettings, promoPipeline, promoStore)
+
+    if metricsExport.get("server_enabled", False):
+        MetricsServer(
+            metrics,
+            metricsExport.get("host", "127.0.0.1"),
+            metricsExport.get("port", 9108),
+        ).Start()
+        log.info(
+            f" 📈 Metrics are available on http://{metricsExport.get('host', '127.0.0.1')}:{metricsExport.get('port', 9108)}/metrics"
         )
 
+    # Every account runs its blocking round in a worker thread,
+    # the semaphore limits how many accounts are processed at the same time.
+    maxConcurrent = max(int(MaxConcurrentAccounts), 1)
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=maxConcurrent)
+    )
+    semaphore = asyncio.Semaphore(maxConcurrent)
+
+    # Accounts are woken up when their taps are full, a card is off cooldown
+    # or AccountsRecheckTime has passed since their last full round.
+    scheduler = AccountScheduler(SchedulerMinDelay)
+    for account in accounts.values():
+        scheduler.Schedule(account, *account.ResumeSchedule(time.time()))
+
+    configWatcher = ConfigWatcher(settings)
+
+    print(f" {w.y}===============[ STARTING ALL ACCOUNTS ]=============== {w.rs}")
+    running = set()
+    # Set when an account finished its round, it may have been scheduled sooner than the loop sleeps
+    wakeUp = asyncio.Event()
+
+    def AccountTaskDone(task):
+        running.discard(task)
+        wakeUp.set()
+        if not task.cancelled() and task.exception() is not None:
+            log.error(f"✖ Account task failed: {w.r}{task.exception()!r}")
+
     while True:
-        print(f" {w.y}===============[ STARTING ALL ACCOUNTS ]=============== {w.rs}")
-        for account in accounts:
-            account.Start()
+        try:
+            newSettings = configWatcher.Poll(time.time())
+            if newSettings is not None:
+                log.info(f" 🔄 {w.y}Config file changed, reloading.{w.rs}")
+                ReloadConfig(
+                    newSettings, accounts, scheduler, promoPipeline, promoStore
+                )
+        except ConfigError as e:
+            log.error(
+                f"✖ Config file was not reloaded: {w.r}{e}{w.rs} {'; '.join(e.errors)}"
+            )
+
+        for account, reasons in scheduler.PopDue():
+            task = asyncio.create_task(
+                RunAccount(account, reasons, semaphore, scheduler)
+            )
+            running.add(task)
+            task.add_done_callback(AccountTaskDone)
 
-        if AccountsRecheckTime < 1 and MaxRandomDelay < 1:
+        SendShardMetrics()
+
+        if not running and len(scheduler) == 0:
+            SendShardMetrics(True)
+            # With more shards than accounts (or after a reload) a shard can be left empty
+            if not accounts:
+                log.info(
+                    f" 🧩 No accounts assigned to this {'shard' if ShardCount > 1 else 'process'}, closing."
+                )
+                return
             log.error(
                 f"{w.r}AccountsRecheckTime{w.rs} and {w.r}MaxRandomDelay{w.rs} values are set to 0, bot will close now."
             )
             return
 
-        if MaxRandomDelay > 0:
-            randomDelay = random.randint(1, MaxRandomDelay)
-            log.warning(
-                f" 😴 Sleeping for {randomDelay} seconds because of random delay."
-            )
-            time.sleep(randomDelay)
+        # Sleep until the next account is due, the config file is still checked on time
+        sleepTime = configWatcher.interval
+        nextDueTime = scheduler.NextDueTime()
+        if nextDueTime is not None:
+            sleepTime = min(max(nextDueTime - time.time(), 0), sleepTime)
 
-        if AccountsRecheckTime > 0:
-            log.warning(
-                f" 💤 Rechecking all accounts in {AccountsRecheckTime} seconds."
-            )
-            time.sleep(AccountsRecheckTime)
+        wakeUp.clear()
+        try:
+            await asyncio.wait_for(wakeUp.wait(), sleepTime)
+        except asyncio.TimeoutError:
+            pass
 
 
 def loading_bar2(duration):
@@ -2300,14 +3366,56 @@ def loading_bar2(duration):
     sys.stdout.flush()
 
 
-def main():
-    clear_screen()
-    show_banner()
-    loading_bar2(5)
-    clear_screen()
+# Entry point of a --shards worker process
+def RunShard(shardIndex, shardCount, logQueue, metricsQueue):
+    global ShardIndex, ShardCount, shardMetricsQueue, metricsExport
+    ShardIndex = shardIndex
+    ShardCount = shardCount
+    shardMetricsQueue = metricsQueue
+    # The supervisor serves and writes the combined metrics
+    metricsExport = {"server_enabled": False, "json_file": ""}
+
+    # Logs are formatted here and printed by the supervisor
+    queueHandler = logging.handlers.QueueHandler(logQueue)
+    queueHandler.setFormatter(
+        ColoredFormatter(
+            LOGFORMAT.replace(
+                "[MasterHamsterKombatBot]",
+                f"[MasterHamsterKombatBot #{shardIndex + 1}]",
+            ),
+            "%Y-%m-%d %H:%M:%S",
+        )
+    )
+    log.removeHandler(stream)
+    log.addHandler(queueHandler)
 
     try:
         asyncio.run(RunAccounts())
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hamster Kombat bot")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split the accounts over N worker processes",
+    )
+    args = parser.parse_args()
+
+    if not HeadlessMode:
+        clear_screen()
+        show_banner()
+        loading_bar2(5)
+        clear_screen()
+
+    try:
+        if args.shards > 1:
+            ShardSupervisor(RunShard, args.shards, metricsExport).Run()
+        else:
+            asyncio.run(RunAccounts())
     except KeyboardInterrupt:
         log.error("Bot Stop by user!")
 
@@ -0,0 +1,271 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import json
+import os
+import re
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# Latency histogram buckets in seconds
+LatencyBuckets = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+# The accounts write the metrics file from their own threads
+dumpLock = threading.Lock()
+
+
+# Turn an URL into a low cardinality endpoint label
+def EndpointLabel(url):
+    path = urlparse(url).path or "/"
+    path = re.sub(r"^/clicker/config/.+$", "/clicker/config/{version}", path)
+    return path
+
+
+# Proxy label without credentials
+def ProxyLabel(proxy):
+    if not proxy:
+        return "direct"
+    proxyUrl = proxy.get("https") or proxy.get("http") or ""
+    parsed = urlparse(proxyUrl)
+    if parsed.hostname is None:
+        return "direct"
+    if parsed.port is not None:
+        return f"{parsed.hostname}:{parsed.port}"
+    return parsed.hostname
+
+
+class EndpointStats:
+    __slots__ = (
+        "count",
+        "statusCounts",
+        "latencySum",
+        "latencyMax",
+        "buckets",
+        "retries",
+        "bytesIn",
+        "bytesOut",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.statusCounts = {}
+        self.latencySum = 0.0
+        self.latencyMax = 0.0
+        self.buckets = [0] * len(LatencyBuckets)
+        self.retries = 0
+        self.bytesIn = 0
+        self.bytesOut = 0
+
+
+# Request metrics labelled by endpoint, method, account and proxy
+class MetricsRegistry:
+    LabelNames = ("endpoint", "method", "account", "proxy")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def _Stats(self, url, method, account, proxy):
+        key = (EndpointLabel(url), method, account, ProxyLabel(proxy))
+        if key not in self.stats:
+            self.stats[key] = EndpointStats()
+        return self.stats[key]
+
+    # Status is the HTTP status code or "error" when no response was received
+    def ObserveRequest(
+        self, url, method, account, proxy, status, latency, bytesOut=0, bytesIn=0
+    ):
+        with self.lock:
+            stats = self._Stats(url, method, account, proxy)
+            stats.count += 1
+            status = str(status)
+            stats.statusCounts[status] = stats.statusCounts.get(status, 0) + 1
+            stats.latencySum += latency
+            stats.latencyMax = max(stats.latencyMax, latency)
+            for index, bucket in enumerate(LatencyBuckets):
+                if latency <= bucket:
+                    stats.buckets[index] += 1
+            stats.bytesIn += bytesIn
+            stats.bytesOut += bytesOut
+
+    def ObserveRetry(self, url, method, account, proxy):
+        with self.lock:
+            self._Stats(url, method, account, proxy).retries += 1
+
+    def Snapshot(self):
+        with self.lock:
+            items = []
+            for key, stats in self.stats.items():
+                item = dict(zip(self.LabelNames, key))
+                item.update(
+                    {
+                        "count": stats.count,
+                        "status": dict(stats.statusCounts),
+                        "latency_avg": (
+                            stats.latencySum / stats.count if stats.count else 0
+                        ),
+                        "latency_max": stats.latencyMax,
+                        "latency_buckets": dict(
+                            zip(
+                                [str(bucket) for bucket in LatencyBuckets],
+                                stats.buckets,
+                            )
+                        ),
+                        "retries": stats.retries,
+                        "bytes_in": stats.bytesIn,
+                        "bytes_out": stats.bytesOut,
+                    }
+                )
+                items.append(item)
+            return items
+
+    # Snapshot of the metrics observed since the last call, the registry starts empty again.
+    # The shards send these deltas, they are added up with MergeSnapshot.
+    def TakeSnapshot(self):
+        with self.lock:
+            stats = self.stats
+            self.stats = {}
+
+        delta = MetricsRegistry()
+        delta.stats = stats
+        return delta.Snapshot()
+
+    # Add the items of a Snapshot() from another registry, used to combine the shard metrics
+    def MergeSnapshot(self, items):
+        with self.lock:
+            for item in items:
+                key = tuple(item[name] for name in self.LabelNames)
+                if key not in self.stats:
+                    self.stats[key] = EndpointStats()
+                stats = self.stats[key]
+                stats.count += item["count"]
+                for status, count in item["status"].items():
+                    stats.statusCounts[status] = (
+                        stats.statusCounts.get(status, 0) + count
+                    )
+                stats.latencySum += item["latency_avg"] * item["count"]
+                stats.latencyMax = max(stats.latencyMax, item["latency_max"])
+                for index, count in enumerate(item["latency_buckets"].values()):
+                    stats.buckets[index] += count
+                stats.retries += item["retries"]
+                stats.bytesIn += item["bytes_in"]
+                stats.bytesOut += item["bytes_out"]
+
+    def DumpJson(self, path):
+        with dumpLock:
+            fd, tempPath = tempfile.mkstemp(
+                dir=os.path.dirname(path) or ".", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w") as file:
+                    json.dump(self.Snapshot(), file, indent=2)
+                os.replace(tempPath, path)
+            except Exception:
+                os.remove(tempPath)
+                raise
+
+    # Prometheus text exposition format
+    def Prometheus(self):
+        lines = [
+            "# HELP hamster_http_requests_total HTTP requests by status code.",
+            "# TYPE hamster_http_requests_total counter",
+        ]
+        histogram = [
+            "# HELP hamster_http_request_duration_seconds HTTP request latency.",
+            "# TYPE hamster_http_request_duration_seconds histogram",
+        ]
+        retries = [
+            "# HELP hamster_http_retries_total Retried HTTP requests.",
+            "# TYPE hamster_http_retries_total counter",
+        ]
+        bytesIn = [
+            "# HELP hamster_http_response_bytes_total Received response body bytes.",
+            "# TYPE hamster_http_response_bytes_total counter",
+        ]
+        bytesOut = [
+            "# HELP hamster_http_request_bytes_total Sent request body bytes.",
+            "# TYPE hamster_http_request_bytes_total counter",
+        ]
+
+        with self.lock:
+            for key, stats in self.stats.items():
+                labels = ",".join(
+                    f'{name}="{EscapeLabel(value)}"'
+                    for name, value in zip(self.LabelNames, key)
+                )
+                for status, count in stats.statusCounts.items():
+                    lines.append(
+                        f'hamster_http_requests_total{{{labels},status="{status}"}} {count}'
+                    )
+                for bucket, count in zip(LatencyBuckets, stats.buckets):
+                    histogram.append(
+                        f'hamster_http_request_duration_seconds_bucket{{{labels},le="{bucket}"}} {count}'
+                    )
+                histogram.append(
+                    f'hamster_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}'
+                )
+                histogram.append(
+                    f"hamster_http_request_duration_seconds_sum{{{labels}}} {stats.latencySum}"
+                )
+                histogram.append(
+                    f"hamster_http_request_duration_seconds_count{{{labels}}} {stats.count}"
+                )
+                retries.append(
+                    f"hamster_http_retries_total{{{labels}}} {stats.retries}"
+                )
+                bytesIn.append(
+                    f"hamster_http_response_bytes_total{{{labels}}} {stats.bytesIn}"
+                )
+                bytesOut.append(
+                    f"hamster_http_request_bytes_total{{{labels}}} {stats.bytesOut}"
+                )
+
+        return "\n".join(lines + histogram + retries + bytesIn + bytesOut) + "\n"
+
+
+def EscapeLabel(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/metrics":
+            body = self.server.registry.Prometheus().encode()
+            contentType = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps(self.server.registry.Snapshot()).encode()
+            contentType = "application/json"
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", contentType)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# Local HTTP server exposing /metrics (Prometheus) and /metrics.json
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, registry, host="127.0.0.1", port=9108):
+        super().__init__((host, port), MetricsHandler)
+        self.registry = registry
+
+    def Start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+# Shared registry of the process
+metrics = MetricsRegistry()
@@ -0,0 +1,273 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Purchases of the required card until a "ByUpgrade" condition is met.
+# The level of upgradesForBuy is the level the next purchase reaches,
+# so the condition level is reached after condition level - level + 1 purchases.
+def LevelsToUnlock(condition, requiredCard):
+    return max(condition.get("level", 0) - requiredCard.get("level", 0) + 1, 0)
+
+
+# Multi-step upgrade planner.
+# The next levels of every card are estimated from the current price and profit,
+# then a multiple-choice knapsack picks the purchases that add the most profit per hour
+# with the balance plus the income of the planning horizon.
+# Cards locked by a "ByUpgrade" condition are planned together with the card that unlocks them.
+class UpgradePlanner:
+    def __init__(
+        self,
+        horizon_hours=24,
+        lookahead_levels=5,
+        budget_steps=1000,
+        price_growth=1.1,
+        profit_growth=1.05,
+    ):
+        self.horizon_hours = horizon_hours
+        self.lookahead_levels = max(int(lookahead_levels), 1)
+        self.budget_steps = max(int(budget_steps), 10)
+        self.price_growth = price_growth
+        self.profit_growth = profit_growth
+
+    # Estimated (price, profitPerHourDelta) of the next levels of a card
+    def ProjectLevels(self, card, levels):
+        if np is not None:
+            steps = np.arange(levels)
+            prices = card["price"] * np.power(self.price_growth, steps)
+            profits = card["profitPerHourDelta"] * np.power(self.profit_growth, steps)
+            return list(zip(prices.tolist(), profits.tolist()))
+
+        return [
+            (
+                card["price"] * self.price_growth**step,
+                card["profitPerHourDelta"] * self.profit_growth**step,
+            )
+            for step in range(levels)
+        ]
+
+    def _IsCandidate(self, card):
+        return (
+            not card.get("isExpired", False)
+            and card.get("profitPerHourDelta", 0) > 0
+            and card.get("price", 0) > 0
+        )
+
+    # Options of a group are (cost, profit, steps), steps are (cardId, levelIndex, price, profit)
+    def _BuildGroups(self, upgrades):
+        cards = {card["id"]: card for card in upgrades if self._IsCandidate(card)}
+        levels = {}
+        dependents = {}
+        for card in cards.values():
+            if card.get("isAvailable", False):
+                continue
+            condition = card.get("condition") or {}
+            if condition.get("_type") != "ByUpgrade":
+                continue
+            required = cards.get(condition.get("upgradeId"))
+            if required is None or not required.get("isAvailable", False):
+                continue
+            neededLevels = LevelsToUnlock(condition, required)
+            if neededLevels > self.lookahead_levels * 2:
+                continue
+            dependents.setdefault(required["id"], []).append((card, neededLevels))
+
+        groups = []
+        for card in cards.values():
+            if not card.get("isAvailable", False):
+                continue
+
+            depth = self.lookahead_levels
+            for dependent, neededLevels in dependents.get(card["id"], []):
+                depth = max(depth, neededLevels)
+            levels[card["id"]] = self.ProjectLevels(card, depth)
+
+            options = []
+            for count in range(1, self.lookahead_levels + 1):
+                options.append(self._Option(card, levels[card["id"]], count))
+
+            for dependent, neededLevels in dependents.get(card["id"], []):
+                dependentLevels = self.ProjectLevels(dependent, self.lookahead_levels)
+                for count in range(1, self.lookahead_levels + 1):
+                    base = self._Option(card, levels[card["id"]], max(neededLevels, 1))
+                    extra = self._Option(dependent, dependentLevels, count)
+                    options.append(
+                        (base[0] + extra[0], base[1] + extra[1], base[2] + extra[2])
+                    )
+
+            groups.append(options)
+        return groups
+
+    def _Option(self, card, cardLevels, count):
+        steps = [
+            (card["id"], index, price, profit)
+            for index, (price, profit) in enumerate(cardLevels[:count])
+        ]
+        return (
+            sum(step[2] for step in steps),
+            sum(step[3] for step in steps),
+            steps,
+        )
+
+    # Multiple-choice knapsack over a discretised budget, returns the chosen option of each group
+    def _Knapsack(self, groups, budget):
+        if budget <= 0 or not groups:
+            return []
+
+        unit = budget / self.budget_steps
+        size = self.budget_steps + 1
+        choices = []
+
+        if np is not None:
+            best = np.zeros(size)
+            for options in groups:
+                current = best.copy()
+                choice = np.full(size, -1, dtype=np.int32)
+                for index, (cost, profit, steps) in enumerate(options):
+                    weight = int(math.ceil(cost / unit))
+                    if weight >= size:
+                        continue
+                    candidate = best[: size - weight] + profit
+                    better = candidate > current[weight:]
+                    current[weight:] = np.where(better, candidate, current[weight:])
+                    choice[weight:] = np.where(better, index, choice[weight:])
+                best = current
+                choices.append(choice)
+        else:
+            best = [0.0] * size
+            for options in groups:
+                current = best[:]
+                choice = [-1] * size
+                for index, (cost, profit, steps) in enumerate(options):
+                    weight = int(math.ceil(cost / unit))
+                    if weight >= size:
+                        continue
+                    for b in range(weight, size):
+                        candidate = best[b - weight] + profit
+                        if candidate > current[b]:
+                            current[b] = candidate
+                            choice[b] = index
+                best = current
+                choices.append(choice)
+
+        # Walk back through the groups to find the chosen options
+        selected = []
+        remaining = self.budget_steps
+        for options, choice in zip(reversed(groups), reversed(choices)):
+            index = int(choice[remaining])
+            if index < 0:
+                continue
+            selected.append(options[index])
+            remaining -= int(math.ceil(options[index][0] / unit))
+        return selected
+
+    # Order the chosen purchases, cheapest profit first while keeping the level order
+    def _OrderSteps(self, selected):
+        queues = {}
+        bundleRatio = {}
+        for cost, profit, steps in selected:
+            cardIds = {step[0] for step in steps}
+            for step in steps:
+                queues.setdefault(step[0], []).append(step)
+            if len(cardIds) > 1:
+                # Unlocking steps are as good as the whole bundle
+                for cardId in cardIds:
+                    bundleRatio[cardId] = min(
+                        bundleRatio.get(cardId, math.inf), cost / profit
+                    )
+
+        dependentsOf = {}
+        for cost, profit, steps in selected:
+            cardIds = []
+            for step in steps:
+                if step[0] not in cardIds:
+                    cardIds.append(step[0])
+            if len(cardIds) > 1:
+                for cardId in cardIds[1:]:
+                    dependentsOf[cardId] = cardIds[0]
+
+        for cardId in queues:
+            queues[cardId].sort(key=lambda step: step[1])
+
+        ordered = []
+        while queues:
+            frontier = [
+                cardId for cardId in queues if dependentsOf.get(cardId) not in queues
+            ]
+            if not frontier:
+                frontier = list(queues)
+            cardId = min(
+                frontier,
+                key=lambda item: min(
+                    queues[item][0][2] / queues[item][0][3],
+                    bundleRatio.get(item, math.inf),
+                ),
+            )
+            ordered.append(queues[cardId].pop(0))
+            if not queues[cardId]:
+                del queues[cardId]
+        return ordered
+
+    # Returns the purchase plan as a list of steps with the estimated wait time before each purchase
+    def Plan(self, upgrades, balance, profitPerHour):
+        horizon = self.horizon_hours * 3600
+        budget = balance + profitPerHour * self.horizon_hours
+        groups = self._BuildGroups(upgrades)
+        selected = self._Knapsack(groups, budget)
+        cards = {card["id"]: card for card in upgrades}
+
+        plan = []
+        elapsed = 0
+        income = profitPerHour / 3600
+        for cardId, index, price, profit in self._OrderSteps(selected):
+            wait = 0
+            if price > balance:
+                if income <= 0:
+                    break
+                wait = (price - balance) / income
+            if index == 0:
+                wait = max(wait, cards[cardId].get("cooldownSeconds", 0) - elapsed)
+            if elapsed + wait > horizon:
+                break
+
+            elapsed += wait
+            balance += wait * income - price
+            income += profit / 3600
+            plan.append(
+                {
+                    "card": cards[cardId],
+                    "levelsAhead": index,
+                    "price": price,
+                    "profitPerHourDelta": profit,
+                    "wait": elapsed,
+                }
+            )
+        return plan
+
+    # Available upgrades ordered by the plan, cards outside the plan follow by price / profit
+    def SortUpgrades(self, upgrades, balance, profitPerHour):
+        plan = self.Plan(upgrades, balance, profitPerHour)
+        ordered = []
+        seen = set()
+        for step in plan:
+            card = step["card"]
+            if card["id"] in seen or not card.get("isAvailable", False):
+                continue
+            seen.add(card["id"])
+            ordered.append(card)
+
+        others = [
+            card
+            for card in upgrades
+            if card["id"] not in seen
+            and card.get("isAvailable", False)
+            and self._IsCandidate(card)
+        ]
+        others.sort(key=lambda x: x["price"] / x["profitPerHourDelta"])
+        return ordered + others, plan
@@ -0,0 +1,79 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import threading
+import time
+
+# Preflight modes
+# always: Send the OPTIONS request before every request (same as the old behaviour)
+# cache: Send the OPTIONS request once and reuse it for ttl seconds, like a browser does
+# off: Never send OPTIONS requests
+PreflightModes = ["always", "cache", "off"]
+
+
+# Remembers successful CORS preflight (OPTIONS) requests of an account
+class PreflightCache:
+    def __init__(self, mode="cache", ttl=600):
+        if mode not in PreflightModes:
+            mode = "cache"
+        self.mode = mode
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.stats = {"sent": 0, "cached": 0, "skipped": 0}
+
+    def _Key(self, url, headers):
+        lowerHeaders = {key.lower(): value for key, value in headers.items()}
+        return (
+            url,
+            str(lowerHeaders.get("access-control-request-headers", "")).lower(),
+            str(lowerHeaders.get("access-control-request-method", "")).upper(),
+        )
+
+    # Returns False if the preflight request can be skipped
+    def ShouldSend(self, url, headers):
+        with self.lock:
+            if self.mode == "off":
+                self.stats["skipped"] += 1
+                return False
+
+            if self.mode == "cache":
+                expiresAt = self.entries.get(self._Key(url, headers), 0)
+                if expiresAt > time.time():
+                    self.stats["cached"] += 1
+                    return False
+
+            self.stats["sent"] += 1
+            return True
+
+    # Store a successful preflight, the server Access-Control-Max-Age can shorten the ttl
+    def Store(self, url, headers, maxAge=None):
+        if self.mode != "cache":
+            return
+
+        ttl = self.ttl
+        try:
+            if maxAge is not None:
+                ttl = min(ttl, int(maxAge))
+        except ValueError:
+            pass
+
+        if ttl <= 0:
+            return
+
+        with self.lock:
+            now = time.time()
+            self.entries = {
+                key: expiresAt
+                for key, expiresAt in self.entries.items()
+                if expiresAt > now
+            }
+            self.entries[self._Key(url, headers)] = now + ttl
+
+    def StartRound(self):
+        with self.lock:
+            self.stats = {"sent": 0, "cached": 0, "skipped": 0}
+
+    def RoundStats(self):
+        with self.lock:
+            return dict(self.stats)
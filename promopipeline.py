@@ -0,0 +1,96 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import logging
+import queue
+import threading
+import warna as w
+
+log = logging.getLogger("pythonConfig")
+
+
+# Background pipeline for playground game keys.
+# Workers generate promo codes for (account, promoId) jobs and keep the finished
+# codes per account until the account claims them on its next pass.
+# With a PromoCodeStore the codes are added to the shared stock instead.
+class PromoKeyPipeline:
+    def __init__(self, workers=4, store=None):
+        self.workers = max(int(workers), 1)
+        self.store = store
+        self.jobs = queue.Queue()
+        self.codes = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.threads = []
+
+    def Start(self):
+        if self.threads:
+            return
+
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._Worker, name=f"PromoKeyWorker-{i + 1}", daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def _Worker(self):
+        while True:
+            account, promoData = self.jobs.get()
+            promoCode = None
+            try:
+                promoCode = account.GetPlayGroundGameKey(promoData)
+            except Exception as e:
+                log.error(
+                    f"{w.rs}{w.g}[{account.account_name}]{w.rs}: ✖ Promo key worker error for {w.bb}{promoData['name']}{w.rs}: {w.r}{e}"
+                )
+
+            if promoCode is not None and self.store is not None:
+                try:
+                    self.store.Add(promoData["promoId"], promoCode)
+                    account.JournalForget("promocode", promoCode)
+                except Exception as e:
+                    log.error(
+                        f"{w.rs}{w.g}[{account.account_name}]{w.rs}: ✖ Unable to store {w.bb}{promoData['name']}{w.rs} key: {w.r}{e}"
+                    )
+                promoCode = None
+
+            with self.lock:
+                key = (account, promoData["promoId"])
+                self.pending[key] = max(self.pending.get(key, 0) - 1, 0)
+                if promoCode is not None:
+                    self.codes.setdefault(account, []).append(
+                        (promoData["promoId"], promoCode)
+                    )
+
+            self.jobs.task_done()
+
+    # Queue a key generation job for the account
+    def Submit(self, account, promoData):
+        with self.lock:
+            key = (account, promoData["promoId"])
+            self.pending[key] = self.pending.get(key, 0) + 1
+        self.jobs.put((account, promoData))
+
+    # Number of keys that are being generated or waiting to be claimed,
+    # use account=None to count the keys of all accounts
+    def PendingCount(self, account=None, promoId=None):
+        with self.lock:
+            count = sum(
+                value
+                for key, value in self.pending.items()
+                if (account is None or key[0] is account)
+                and (promoId is None or key[1] == promoId)
+            )
+            for codeAccount, codes in self.codes.items():
+                if account is not None and codeAccount is not account:
+                    continue
+                count += len(
+                    [code for code in codes if promoId is None or code[0] == promoId]
+                )
+            return count
+
+    # Returns all finished codes of the account as (promoId, promoCode) pairs
+    def TakeCodes(self, account):
+        with self.lock:
+            return self.codes.pop(account, [])
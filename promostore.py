@@ -0,0 +1,162 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import sqlite3
+import threading
+import time
+
+
+# Persistent stock of playground game promo codes shared by all accounts.
+# Codes from api.gamepromo.io are not tied to the account that generated them,
+# so any account can take a code of the same promoId.
+# A taken code is reserved until it is consumed or released, reservations older than
+# reserve_seconds (the account stopped before claiming the code) go back to the stock.
+# A released code is taken after the codes that never failed, and it is discarded after
+# max_attempts failed claims so a code the API rejects can not block the stock.
+class PromoCodeStore:
+    # Values of the consumed column
+    STOCK = 0
+    CONSUMED = 1
+    RESERVED = 2
+    DISCARDED = 3
+
+    def __init__(
+        self,
+        path="promo_codes.db",
+        keep_consumed_days=7,
+        reserve_seconds=3600,
+        max_attempts=3,
+    ):
+        self.path = path
+        self.keep_consumed_days = keep_consumed_days
+        self.reserve_seconds = reserve_seconds
+        self.max_attempts = max(int(max_attempts), 1)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS promo_codes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                promo_id TEXT NOT NULL,
+                promo_code TEXT NOT NULL UNIQUE,
+                created_at INTEGER NOT NULL,
+                consumed INTEGER NOT NULL DEFAULT 0,
+                consumed_at INTEGER,
+                consumed_by TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Databases of older versions have no attempts column
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(promo_codes)")]
+        if "attempts" not in columns:
+            self.db.execute(
+                "ALTER TABLE promo_codes ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"
+            )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS promo_codes_stock ON promo_codes (promo_id, consumed, id)"
+        )
+        self.Cleanup()
+
+    def Add(self, promoId, promoCode):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR IGNORE INTO promo_codes (promo_id, promo_code, created_at) VALUES (?, ?, ?)",
+                (promoId, promoCode, int(time.time())),
+            )
+
+    # Reserve the oldest unused code of the promo with the fewest failed claims,
+    # returns None if the stock is empty.
+    # The code has to be consumed after it was claimed or released when the claim failed.
+    def Take(self, promoId, accountName=""):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.execute(
+                    "UPDATE promo_codes SET consumed = ?, consumed_at = NULL, consumed_by = NULL WHERE consumed = ? AND consumed_at < ?",
+                    (
+                        self.STOCK,
+                        self.RESERVED,
+                        int(time.time()) - self.reserve_seconds,
+                    ),
+                )
+                row = self.db.execute(
+                    "SELECT id, promo_code FROM promo_codes WHERE promo_id = ? AND consumed = ? ORDER BY attempts, id LIMIT 1",
+                    (promoId, self.STOCK),
+                ).fetchone()
+                if row is not None:
+                    self.db.execute(
+                        "UPDATE promo_codes SET consumed = ?, consumed_at = ?, consumed_by = ? WHERE id = ?",
+                        (self.RESERVED, int(time.time()), accountName, row[0]),
+                    )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        return row[1]
+
+    def Consume(self, promoCode):
+        with self.lock:
+            self.db.execute(
+                "UPDATE promo_codes SET consumed = ?, consumed_at = ? WHERE promo_code = ?",
+                (self.CONSUMED, int(time.time()), promoCode),
+            )
+
+    # Put a reserved code back in the stock after a failed claim,
+    # the code is discarded when it failed max_attempts times
+    def Release(self, promoCode):
+        with self.lock:
+            self.db.execute(
+                "UPDATE promo_codes SET attempts = attempts + 1 WHERE promo_code = ? AND consumed = ?",
+                (promoCode, self.RESERVED),
+            )
+            self.db.execute(
+                "UPDATE promo_codes SET consumed = CASE WHEN attempts >= ? THEN ? ELSE ? END, consumed_at = CASE WHEN attempts >= ? THEN ? END, consumed_by = NULL WHERE promo_code = ? AND consumed = ?",
+                (
+                    self.max_attempts,
+                    self.DISCARDED,
+                    self.STOCK,
+                    self.max_attempts,
+                    int(time.time()),
+                    promoCode,
+                    self.RESERVED,
+                ),
+            )
+
+    def Available(self, promoId=None):
+        with self.lock:
+            if promoId is None:
+                row = self.db.execute(
+                    "SELECT COUNT(*) FROM promo_codes WHERE consumed = ?",
+                    (self.STOCK,),
+                ).fetchone()
+            else:
+                row = self.db.execute(
+                    "SELECT COUNT(*) FROM promo_codes WHERE promo_id = ? AND consumed = ?",
+                    (promoId, self.STOCK),
+                ).fetchone()
+        return row[0]
+
+    # Remove old consumed and discarded codes to keep the database small
+    def Cleanup(self):
+        if self.keep_consumed_days <= 0:
+            return
+
+        with self.lock:
+            self.db.execute(
+                "DELETE FROM promo_codes WHERE consumed IN (?, ?) AND consumed_at < ?",
+                (
+                    self.CONSUMED,
+                    self.DISCARDED,
+                    int(time.time()) - self.keep_consumed_days * 86400,
+                ),
+            )
+
+    def Close(self):
+        with self.lock:
+            self.db.close()
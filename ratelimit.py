@@ -0,0 +1,110 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+# Key of the budgets of a proxy. Rotating gateways give every user (different credentials)
+# its own egress IP behind the same host:port, so the full proxy URL is used.
+# ProxyLabel is only used to show the proxy without its credentials.
+def ProxyKey(proxy):
+    if not proxy:
+        return "direct"
+    return proxy.get("https") or proxy.get("http") or "direct"
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Take a token, returns the number of seconds the caller has to wait for it
+    def Reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+
+# Request budgets of every egress IP.
+# Each proxy (all accounts without a proxy share "direct") has a token bucket, a token bucket
+# per API host and a maximum number of requests in flight. Requests wait for their turn
+# and the waiting time is kept per proxy so the scheduler can slow down busy proxies.
+class RateLimiter:
+    def __init__(self, proxy_rate=0, proxy_burst=10, proxy_connections=0, hosts=None):
+        self.proxy_rate = proxy_rate
+        self.proxy_burst = proxy_burst
+        self.proxy_connections = proxy_connections
+        self.hosts = hosts or {}
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.connections = {}
+        self.queueDelay = {}
+
+    def _Bucket(self, key, rate, burst):
+        with self.lock:
+            if key not in self.buckets:
+                self.buckets[key] = TokenBucket(rate, burst)
+            return self.buckets[key]
+
+    def _Connections(self, proxy):
+        with self.lock:
+            if proxy not in self.connections:
+                self.connections[proxy] = threading.BoundedSemaphore(
+                    self.proxy_connections
+                )
+            return self.connections[proxy]
+
+    def _Wait(self, proxy, url):
+        wait = 0
+        if self.proxy_rate > 0:
+            wait = self._Bucket(proxy, self.proxy_rate, self.proxy_burst).Reserve()
+
+        host = urlparse(url).hostname
+        if host in self.hosts and self.hosts[host][0] > 0:
+            rate, burst = self.hosts[host]
+            wait = max(wait, self._Bucket((proxy, host), rate, burst).Reserve())
+        return wait
+
+    # Average waiting time of the last requests of the proxy
+    def QueueDelay(self, proxy):
+        return self.queueDelay.get(ProxyKey(proxy), 0)
+
+    def _RecordDelay(self, proxy, waited):
+        with self.lock:
+            previous = self.queueDelay.get(proxy, waited)
+            self.queueDelay[proxy] = previous * 0.8 + waited * 0.2
+
+    # Wait until the request can be sent, yields the number of seconds waited
+    @contextmanager
+    def Request(self, proxy, url):
+        proxy = ProxyKey(proxy)
+        start = time.monotonic()
+        wait = self._Wait(proxy, url)
+        if wait > 0:
+            time.sleep(wait)
+
+        connections = None
+        if self.proxy_connections > 0:
+            connections = self._Connections(proxy)
+            connections.acquire()
+
+        waited = time.monotonic() - start
+        self._RecordDelay(proxy, waited)
+        try:
+            yield waited
+        finally:
+            if connections is not None:
+                connections.release()
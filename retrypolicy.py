@@ -0,0 +1,146 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+# POST endpoints that only read data, they can be sent again safely
+IdempotentPostPaths = [
+    "/auth/account-info",
+    "/clicker/sync",
+    "/clicker/config",
+    "/clicker/upgrades-for-buy",
+    "/clicker/boosts-for-buy",
+    "/clicker/list-tasks",
+    "/clicker/list-airdrop-tasks",
+    "/clicker/get-promos",
+]
+
+RetryStatusCodes = [429, 500, 502, 503, 504]
+
+
+# Decides which failed requests are sent again and how long to wait before.
+# GET, OPTIONS and read-only POST requests are retried after errors and 429/5xx responses.
+# Other POST requests (taps, purchases, claims) are only retried when the server
+# certainly did not process them: connection failures and 429/503 responses.
+class RetryPolicy:
+    def __init__(self, max_attempts=3, base_delay=1, max_delay=30):
+        self.max_attempts = max(int(max_attempts), 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def IsIdempotent(self, method, url):
+        if method in ["GET", "OPTIONS"]:
+            return True
+        return urlparse(url).path in IdempotentPostPaths
+
+    def ShouldRetry(self, method, url, response, error, attempt):
+        if attempt >= self.max_attempts:
+            return False
+
+        idempotent = self.IsIdempotent(method, url)
+        if error is not None:
+            if idempotent:
+                return isinstance(error, requests.RequestException)
+            return RequestNotSent(error)
+
+        if response is None or response.status_code not in RetryStatusCodes:
+            return False
+        return idempotent or response.status_code in [429, 503]
+
+    # Exponential backoff with full jitter, Retry-After of the server is used when it is longer
+    def Delay(self, attempt, response=None):
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        retryAfter = RetryAfterSeconds(response)
+        if retryAfter is not None:
+            delay = max(delay, min(retryAfter, self.max_delay))
+        return delay
+
+
+# True when the connection failed before the request could reach the server
+def RequestNotSent(error):
+    if isinstance(
+        error,
+        (
+            requests.ConnectTimeout,
+            requests.exceptions.ProxyError,
+            requests.exceptions.SSLError,
+        ),
+    ):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def RetryAfterSeconds(response):
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(
+            email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0
+        )
+    except Exception:
+        return None
+
+
+# Stops the calls of every account to a host through a proxy that keeps failing,
+# the key is the (proxy, host) pair so a dead proxy only stops its own accounts.
+# After failure_threshold failures in a row the circuit is open for open_seconds,
+# then one request is let through; its success closes the circuit again.
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, open_seconds=60):
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.open_seconds = open_seconds
+        self.lock = threading.Lock()
+        self.failures = {}
+        self.openUntil = {}
+        self.trialRunning = {}
+
+    def Allow(self, key):
+        with self.lock:
+            openUntil = self.openUntil.get(key)
+            if openUntil is None:
+                return True
+            if time.time() < openUntil or self.trialRunning.get(key, False):
+                return False
+            # Half open, a single request checks if the host is back
+            self.trialRunning[key] = True
+            return True
+
+    # Seconds until the next request to the key is allowed
+    def RetryIn(self, key):
+        with self.lock:
+            return max(self.openUntil.get(key, 0) - time.time(), 0)
+
+    # Returns True when this failure opened the circuit
+    def Record(self, key, success):
+        with self.lock:
+            if success:
+                self.failures.pop(key, None)
+                self.openUntil.pop(key, None)
+                self.trialRunning.pop(key, None)
+                return False
+
+            self.failures[key] = self.failures.get(key, 0) + 1
+            wasClosed = key not in self.openUntil
+            if self.failures[key] >= self.failure_threshold or self.trialRunning.get(
+                key, False
+            ):
+                self.openUntil[key] = time.time() + self.open_seconds
+                self.trialRunning[key] = False
+                return wasClosed
+            return False
@@ -0,0 +1,148 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import heapq
+import itertools
+import threading
+import time
+
+
+# Heap of values ordered by their due time, with at most one pending value per key.
+# Replaced and removed entries are only flagged and skipped when they reach the top.
+class DueHeap:
+    def __init__(self):
+        self.heap = []
+        self.entries = {}
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+
+    def Push(self, key, dueTime, value):
+        with self.lock:
+            entry = [dueTime, next(self.counter), key, value, True]
+            oldEntry = self.entries.get(key)
+            if oldEntry is not None:
+                # Lazy removal, the old entry is skipped when it is popped
+                oldEntry[4] = False
+            self.entries[key] = entry
+            heapq.heappush(self.heap, entry)
+
+    def Remove(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                entry[4] = False
+
+    def Clear(self):
+        with self.lock:
+            self.heap = []
+            self.entries = {}
+
+    # Returns the due entries as (key, value) pairs, the earliest first
+    def PopDue(self, now=None):
+        if now is None:
+            now = time.time()
+
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                dueTime, _, key, value, active = heapq.heappop(self.heap)
+                if not active:
+                    continue
+                del self.entries[key]
+                due.append((key, value))
+        return due
+
+    def NextDueTime(self):
+        with self.lock:
+            while self.heap and not self.heap[0][4]:
+                heapq.heappop(self.heap)
+            if not self.heap:
+                return None
+            return self.heap[0][0]
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+
+# Priority queue of account wake-ups.
+# Every account has at most one pending wake-up with the list of work that is due,
+# "full" runs the whole account round, other reasons only run their own phase.
+class AccountScheduler:
+    def __init__(self, min_delay=30, group_window=5):
+        self.min_delay = min_delay
+        self.group_window = group_window
+        self.queue = DueHeap()
+
+    def Schedule(self, account, dueTime, reasons):
+        self.queue.Push(account, dueTime, list(reasons))
+
+    # Schedule the next wake-up from the account hints, hints are {reason: seconds}.
+    # queueDelay is the time the requests of the account wait for their proxy budget.
+    # dueTimes are exact wake-up times {reason: time} that are not delayed by min_delay.
+    def ScheduleNext(
+        self, account, hints, fullPassTime=None, queueDelay=0, dueTimes=None
+    ):
+        now = time.time()
+        wakeUps = {}
+        for reason, seconds in hints.items():
+            wakeUps[reason] = now + max(seconds, self.min_delay) + queueDelay
+
+        for reason, dueTime in (dueTimes or {}).items():
+            if dueTime is not None:
+                wakeUps[reason] = max(dueTime, now) + queueDelay
+
+        if fullPassTime is not None:
+            wakeUps["full"] = fullPassTime
+
+        if not wakeUps:
+            return None
+
+        dueTime = min(wakeUps.values())
+        reasons = [
+            reason
+            for reason, wakeUp in wakeUps.items()
+            if wakeUp <= dueTime + self.group_window
+        ]
+        self.Schedule(account, dueTime, reasons)
+        return dueTime, reasons
+
+    def Remove(self, account):
+        self.queue.Remove(account)
+
+    # Returns the accounts that are due as (account, reasons) pairs
+    def PopDue(self, now=None):
+        return self.queue.PopDue(now)
+
+    def NextDueTime(self):
+        return self.queue.NextDueTime()
+
+    def __len__(self):
+        return len(self.queue)
+
+
+# Cards of an account that are bought when their cooldown ends.
+# The intents are kept by due time, one intent per card, so the account does other
+# work (or none) while the cards cool down instead of sleeping.
+class PurchaseIntents:
+    def __init__(self):
+        self.queue = DueHeap()
+
+    def Add(self, card, dueTime):
+        self.queue.Push(card["id"], dueTime, card)
+
+    def Remove(self, cardId):
+        self.queue.Remove(cardId)
+
+    def Clear(self):
+        self.queue.Clear()
+
+    # Returns the cards that are due, the earliest first
+    def PopDue(self, now=None):
+        return [card for cardId, card in self.queue.PopDue(now)]
+
+    def NextDueTime(self):
+        return self.queue.NextDueTime()
+
+    def __len__(self):
+        return len(self.queue)
@@ -0,0 +1,122 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Long-lived pooled HTTP session owned by a single account.
+# The session is bound to the account proxy, it is rebuilt when the proxy changes
+# and closed when it was idle for longer than idle_timeout seconds.
+class AccountSession:
+    def __init__(self, proxy, pool_size=10, idle_timeout=600):
+        self.proxy = proxy or {}
+        self.pool_size = max(int(pool_size), 1)
+        self.idle_timeout = idle_timeout
+        self.session = None
+        self.lastUsed = 0
+        self.lock = threading.Lock()
+
+        # Counters of sessions that were already closed
+        self.closedConnections = 0
+        self.closedRequests = 0
+
+        # Counters at the start of the current round
+        self.roundConnections = 0
+        self.roundRequests = 0
+
+    def _ProxyKey(self, proxy):
+        return tuple(sorted((proxy or {}).items()))
+
+    def _CreateSession(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size, pool_maxsize=self.pool_size
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _Pools(self, session):
+        pools = []
+        # The same adapter is mounted for http and https
+        adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+        for adapter in adapters.values():
+            managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+            for manager in managers:
+                if manager is None:
+                    continue
+                for key in list(manager.pools.keys()):
+                    pool = manager.pools.get(key)
+                    if pool is not None:
+                        pools.append(pool)
+        return pools
+
+    def _Counters(self, session):
+        connections = 0
+        requests_count = 0
+        if session is not None:
+            for pool in self._Pools(session):
+                connections += getattr(pool, "num_connections", 0)
+                requests_count += getattr(pool, "num_requests", 0)
+        return connections, requests_count
+
+    def _CloseSession(self):
+        if self.session is None:
+            return
+        connections, requests_count = self._Counters(self.session)
+        self.closedConnections += connections
+        self.closedRequests += requests_count
+        self.session.close()
+        self.session = None
+
+    # Return the pooled session for the given proxy, creating it if needed
+    def GetSession(self, proxy=None):
+        with self.lock:
+            now = time.time()
+            if proxy is not None and self._ProxyKey(proxy) != self._ProxyKey(
+                self.proxy
+            ):
+                self._CloseSession()
+                self.proxy = proxy
+
+            if (
+                self.session is not None
+                and self.idle_timeout > 0
+                and now - self.lastUsed > self.idle_timeout
+            ):
+                self._CloseSession()
+
+            if self.session is None:
+                self.session = self._CreateSession()
+
+            self.lastUsed = now
+            return self.session
+
+    def Close(self):
+        with self.lock:
+            self._CloseSession()
+
+    def TotalCounters(self):
+        with self.lock:
+            connections, requests_count = self._Counters(self.session)
+            return (
+                self.closedConnections + connections,
+                self.closedRequests + requests_count,
+            )
+
+    def StartRound(self):
+        self.roundConnections, self.roundRequests = self.TotalCounters()
+
+    # Returns new and reused connections since the start of the round
+    def RoundStats(self):
+        connections, requests_count = self.TotalCounters()
+        newConnections = connections - self.roundConnections
+        sentRequests = requests_count - self.roundRequests
+        return {
+            "requests": sentRequests,
+            "new_connections": newConnections,
+            "reused_connections": max(sentRequests - newConnections, 0),
+        }
@@ -0,0 +1,140 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import time
+
+import warna as w
+from metrics import MetricsRegistry, MetricsServer
+
+log = logging.getLogger("pythonConfig")
+
+
+def _ProxyKey(proxy):
+    return tuple(sorted((proxy or {}).items()))
+
+
+# Split the accounts between the shards.
+# Accounts that share a proxy are spread over the shards so that no shard sends
+# all the requests of one proxy, the biggest proxy groups are placed first.
+def AssignShards(accounts, shards):
+    shards = max(int(shards), 1)
+    groups = {}
+    for account in accounts:
+        groups.setdefault(_ProxyKey(account["Proxy"]), []).append(account)
+
+    result = [[] for _ in range(shards)]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        order = sorted(range(shards), key=lambda index: (len(result[index]), index))
+        for count, account in enumerate(group):
+            result[order[count % shards]].append(account)
+    return result
+
+
+# Runs every shard in its own process and restarts the shards that crash.
+# The shards send their formatted logs and metrics deltas back through queues,
+# the supervisor prints the logs and serves / writes the combined metrics.
+class ShardSupervisor:
+    def __init__(self, target, shards, metricsExport=None, restart_delay=10):
+        self.target = target
+        self.shards = max(int(shards), 1)
+        self.metricsExport = metricsExport or {}
+        self.restart_delay = restart_delay
+        self.context = multiprocessing.get_context("spawn")
+        self.logQueue = self.context.Queue()
+        self.metricsQueue = self.context.Queue()
+        self.processes = {}
+        self.restartAt = {}
+        self.registry = MetricsRegistry()
+        self.metricsServer = None
+
+    def _StartShard(self, shardIndex):
+        process = self.context.Process(
+            target=self.target,
+            args=(shardIndex, self.shards, self.logQueue, self.metricsQueue),
+            name=f"shard-{shardIndex + 1}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[shardIndex] = process
+        log.info(
+            f" 🧩 Shard {w.b}{shardIndex + 1}/{self.shards}{w.rs} started, pid {process.pid}."
+        )
+
+    def _CheckShards(self, now):
+        running = 0
+        for shardIndex, process in list(self.processes.items()):
+            if process.is_alive():
+                running += 1
+                continue
+
+            if process.exitcode == 0:
+                # The shard has nothing left to do
+                continue
+
+            if shardIndex not in self.restartAt:
+                log.error(
+                    f"✖ Shard {w.r}{shardIndex + 1}{w.rs} stopped with exit code {process.exitcode}, restarting in {self.restart_delay} seconds."
+                )
+                self.restartAt[shardIndex] = now + self.restart_delay
+            running += 1
+
+            if self.restartAt[shardIndex] <= now:
+                del self.restartAt[shardIndex]
+                self._StartShard(shardIndex)
+        return running
+
+    def _CollectMetrics(self):
+        updated = False
+        while True:
+            try:
+                shardIndex, delta = self.metricsQueue.get_nowait()
+            except queue.Empty:
+                break
+            self.registry.MergeSnapshot(delta)
+            updated = True
+
+        if not updated:
+            return
+
+        if self.metricsExport.get("json_file", "") != "":
+            try:
+                self.registry.DumpJson(self.metricsExport["json_file"])
+            except Exception as e:
+                log.error(f"✖ Unable to write the metrics file: {w.r}{e}")
+
+    def Run(self):
+        handler = logging.StreamHandler()
+        # The shards send already formatted messages
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        listener = logging.handlers.QueueListener(self.logQueue, handler)
+        listener.start()
+
+        if self.metricsExport.get("server_enabled", False):
+            self.metricsServer = MetricsServer(
+                self.registry,
+                self.metricsExport.get("host", "127.0.0.1"),
+                self.metricsExport.get("port", 9108),
+            ).Start()
+
+        try:
+            for shardIndex in range(self.shards):
+                self._StartShard(shardIndex)
+
+            while True:
+                self._CollectMetrics()
+                if self._CheckShards(time.time()) == 0:
+                    self._CollectMetrics()
+                    log.info(" 🧩 All shards finished.")
+                    return
+                time.sleep(1)
+        finally:
+            for process in self.processes.values():
+                if process.is_alive():
+                    process.terminate()
+            for process in self.processes.values():
+                process.join(5)
+            listener.stop()
@@ -0,0 +1,48 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+
+
+# Time of the first daily reset of the game after now, hour is in UTC
+def NextDailyReset(now, hour=0):
+    reset = now - now % 86400 + hour * 3600
+    while reset <= now:
+        reset += 86400
+    return reset
+
+
+# What is already known about the server state of an account.
+# When a response shows that there is nothing left to do (the cipher is claimed, all tasks
+# are completed, no free boost, ...) the endpoint is remembered until its state can change
+# again and its call is skipped until then.
+class KnownState:
+    __slots__ = ("validUntil",)
+
+    def __init__(self):
+        self.validUntil = {}
+
+    def IsKnown(self, name, now):
+        validUntil = self.validUntil.get(name)
+        if validUntil is None:
+            return False
+        if validUntil <= now:
+            del self.validUntil[name]
+            return False
+        return True
+
+    # The state is kept for max_age seconds at most, until the daily reset when reset_hour
+    # is set and for remain_seconds when the server told when the state changes
+    def Remember(self, name, now, max_age, reset_hour=None, remain_seconds=None):
+        validUntil = now + max_age
+        if reset_hour is not None:
+            validUntil = min(validUntil, NextDailyReset(now, reset_hour))
+        if remain_seconds is not None and remain_seconds > 0:
+            validUntil = min(validUntil, now + remain_seconds)
+        if validUntil > now:
+            self.validUntil[name] = validUntil
+
+    def Forget(self, name=None):
+        if name is None:
+            self.validUntil.clear()
+        else:
+            self.validUntil.pop(name, None)
@@ -0,0 +1,38 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+
+
+# Decides when the taps of an account are sent and how many.
+# The energy grows by tapsRecoverPerSec up to maxTaps. The taps are sent when the energy is
+# nearly full so each tap request uses as much energy as possible, and the account is woken
+# up wake_margin seconds before the energy is full so no energy is lost at the cap.
+class TapPlanner:
+    def __init__(self, min_fill=0.9, wake_margin=60):
+        self.min_fill = min(max(min_fill, 0), 1)
+        self.wake_margin = max(wake_margin, 0)
+
+    # Energy after elapsed seconds since the server sent availableTaps
+    def Energy(self, availableTaps, maxTaps, recoverPerSec, elapsed):
+        return min(availableTaps + max(elapsed, 0) * recoverPerSec, maxTaps)
+
+    # Energy from which the taps are sent
+    def TapLevel(self, maxTaps, recoverPerSec):
+        level = min(maxTaps * self.min_fill, maxTaps - self.wake_margin * recoverPerSec)
+        return max(level, 1)
+
+    def ShouldTap(self, energy, maxTaps, recoverPerSec):
+        if energy < 1:
+            return False
+        # Without regeneration waiting does not bring more taps
+        return recoverPerSec <= 0 or energy >= self.TapLevel(maxTaps, recoverPerSec)
+
+    # Seconds until the taps should be sent, None when the energy does not regenerate
+    def WakeIn(self, energy, maxTaps, recoverPerSec):
+        if recoverPerSec <= 0:
+            return None
+        return max(self.TapLevel(maxTaps, recoverPerSec) - energy, 0) / recoverPerSec
+
+    # The free boost refills the energy, it is only worth it when the energy is nearly empty
+    def ShouldBoost(self, energy, maxTaps):
+        return energy <= maxTaps * (1 - self.min_fill)
@@ -0,0 +1,48 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+# Runs a set of calls as a dependency graph and returns their results by name.
+# tasks maps a name to (function, [names of the tasks it has to wait for]),
+# every task whose dependencies are done is started on the executor right away.
+# Without an executor the tasks run one after another in the given order.
+def RunTaskGraph(executor, tasks):
+    results = {}
+    pending = dict(tasks)
+    for name, (function, dependencies) in pending.items():
+        for dependency in dependencies:
+            if dependency not in pending:
+                raise ValueError(f"Task {name} depends on unknown task {dependency}")
+
+    if executor is None:
+        while pending:
+            for name, (function, dependencies) in list(pending.items()):
+                if all(dependency in results for dependency in dependencies):
+                    del pending[name]
+                    results[name] = function()
+                    break
+            else:
+                raise ValueError("The task graph has a dependency cycle")
+        return results
+
+    running = {}
+    try:
+        while pending or running:
+            for name, (function, dependencies) in list(pending.items()):
+                if all(dependency in results for dependency in dependencies):
+                    del pending[name]
+                    running[executor.submit(function)] = name
+
+            if not running:
+                raise ValueError("The task graph has a dependency cycle")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    finally:
+        # Do not leave calls behind when a task failed
+        for future in running:
+            future.cancel()
+    return results
@@ -0,0 +1,149 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import logging
+import queue
+import threading
+import time
+
+import requests
+
+log = logging.getLogger("pythonConfig")
+
+# Telegram refuses messages longer than 4096 characters
+MaxMessageLength = 4096
+
+
+# Background Telegram log sender.
+# Messages are queued without blocking the accounts, a worker thread joins the messages
+# of every chat into one sendMessage per flush interval.
+# When the queue is full new messages are dropped and a summary is sent with the next batch.
+class TelegramLogDispatcher:
+    def __init__(
+        self,
+        bot_token,
+        flush_interval=3,
+        queue_size=1000,
+        api_url="https://api.telegram.org",
+    ):
+        self.bot_token = bot_token
+        self.flush_interval = max(flush_interval, 1)
+        self.api_url = api_url
+        self.queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.dropped = {}
+        self.pending = {}
+        self.retryAt = {}
+        self.backoff = {}
+        self.thread = None
+
+    def Start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._Worker, daemon=True)
+            self.thread.start()
+        return self
+
+    # Never blocks, returns False if the message was dropped
+    def Send(self, chatId, message):
+        try:
+            self.queue.put_nowait((str(chatId), str(message)))
+            return True
+        except queue.Full:
+            with self.lock:
+                self.dropped[str(chatId)] = self.dropped.get(str(chatId), 0) + 1
+            return False
+
+    def _Worker(self):
+        while True:
+            deadline = time.time() + self.flush_interval
+            while True:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    chatId, message = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                self.pending.setdefault(chatId, []).append(message)
+
+            with self.lock:
+                dropped = self.dropped
+                self.dropped = {}
+
+            for chatId, count in dropped.items():
+                self.pending.setdefault(chatId, []).append(
+                    f"⚠ {count} log messages were dropped, Telegram is too slow."
+                )
+
+            for chatId in list(self.pending):
+                if self.retryAt.get(chatId, 0) > time.time():
+                    continue
+                self._Flush(chatId)
+
+    def _Flush(self, chatId):
+        messages = self.pending.pop(chatId, [])
+        while messages:
+            text, count = self._Batch(messages)
+            retryAfter = self._SendMessage(chatId, text)
+            if retryAfter > 0:
+                # Keep the unsent messages and wait before sending to this chat again,
+                # the oldest ones are dropped if too many are waiting
+                overflow = len(messages) - self.queue.maxsize
+                if overflow > 0:
+                    messages = messages[overflow:]
+                    with self.lock:
+                        self.dropped[chatId] = self.dropped.get(chatId, 0) + overflow
+                self.pending[chatId] = messages
+                self.retryAt[chatId] = time.time() + retryAfter
+                return
+            messages = messages[count:]
+            self.retryAt.pop(chatId, None)
+            self.backoff.pop(chatId, None)
+            # Telegram allows about 30 messages per second for a bot
+            time.sleep(1 / 30)
+
+    # Join as many messages as fit in one Telegram message, returns the text and the number of messages
+    def _Batch(self, messages):
+        text = messages[0][:MaxMessageLength]
+        count = 1
+        while count < len(messages):
+            if len(text) + 2 + len(messages[count]) > MaxMessageLength:
+                break
+            text += "\n\n" + messages[count]
+            count += 1
+        return text, count
+
+    # Returns the number of seconds to wait before retrying, 0 when done
+    def _SendMessage(self, chatId, text):
+        try:
+            response = self.session.post(
+                f"{self.api_url}/bot{self.bot_token}/sendMessage",
+                data={"chat_id": chatId, "text": text},
+                timeout=10,
+            )
+        except Exception as e:
+            log.error(f"✖ TelegramLog error: {e}")
+            return self._Backoff(chatId)
+
+        if response.status_code == 429:
+            try:
+                return max(int(response.json()["parameters"]["retry_after"]), 1)
+            except Exception:
+                return self._Backoff(chatId)
+
+        if response.status_code >= 500:
+            return self._Backoff(chatId)
+
+        if response.status_code != 200:
+            # Bad chat id or token, retrying will not help
+            log.error(
+                f"✖ TelegramLog error: {response.status_code} {response.text[:200]}"
+            )
+        return 0
+
+    # Double the wait after every failure, up to 5 minutes
+    def _Backoff(self, chatId):
+        wait = min(self.backoff.get(chatId, self.flush_interval / 2) * 2, 300)
+        self.backoff[chatId] = wait
+        return wait
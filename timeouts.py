@@ -0,0 +1,56 @@
+# Developed by: MasterkinG32
+# Date: 2024
+# Github: https://github.com/masterking32
+import threading
+from collections import deque
+
+from metrics import EndpointLabel, ProxyLabel
+
+
+# Request timeouts that follow the latency of each endpoint and proxy.
+# The read timeout is a multiple of the p99 of the last requests, a request that timed out
+# is a sample at its timeout. Until enough requests were seen the maximum read timeout is used.
+class AdaptiveTimeouts:
+    def __init__(
+        self,
+        connect=5,
+        read_min=3,
+        read_max=30,
+        p99_multiplier=3,
+        window=100,
+        min_samples=20,
+    ):
+        self.connect = connect
+        self.read_min = read_min
+        self.read_max = read_max
+        self.p99_multiplier = p99_multiplier
+        self.window = window
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def _Key(self, url, proxy):
+        return (EndpointLabel(url), ProxyLabel(proxy))
+
+    def Observe(self, url, proxy, latency):
+        key = self._Key(url, proxy)
+        with self.lock:
+            if key not in self.samples:
+                self.samples[key] = deque(maxlen=self.window)
+            self.samples[key].append(latency)
+
+    def P99(self, url, proxy):
+        with self.lock:
+            samples = self.samples.get(self._Key(url, proxy))
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)]
+
+    # Returns the (connect, read) timeout for requests
+    def Timeout(self, url, proxy):
+        p99 = self.P99(url, proxy)
+        if p99 is None:
+            return self.connect, self.read_max
+        read = min(max(p99 * self.p99_multiplier, self.read_min), self.read_max)
+        return self.connect, read
@@ -5,14 +5,6 @@ import base64
 import os
 
 
-# Sort upgrades by best profit per hour (profitPerHourDelta / price)
-# You can change this to sort by price, profitPerHourDelta, level, etc.
-def SortUpgrades(upgrades, max_budget):
-    upgrades = [item for item in upgrades if item["price"] <= max_budget]
-    upgrades.sort(key=lambda x: x["price"] / x["profitPerHourDelta"])
-    return upgrades
-
-
 def CalculateCardProfitCoefficient(card):
     return card["price"] / card["profitPerHourDelta"]
 